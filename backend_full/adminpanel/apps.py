@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AdminpanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'adminpanel'
+
+    def ready(self):
+        from backend import events, sitemaps
+        events.connect_signals()
+        sitemaps.connect_signals()
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from backend.fragments import touch
+from backend.images import describe_file
+from gallery.models import GalleryImage
+from realty.models import RealtyImage
+
+IMAGE_MODELS = [RealtyImage, GalleryImage]
+FIELDS = ["placeholder", "dominant_color", "aspect_ratio", "width", "height", "bytes"]
+
+
+class Command(BaseCommand):
+    help = "Compute placeholders, dominant colour and dimensions for images that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Threads decoding images (default: one per CPU); Pillow releases the GIL while decoding.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Images decoded and written per bulk_update.",
+        )
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Recompute every image, not only those without a placeholder.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for model in IMAGE_MODELS:
+                queryset = model.objects.exclude(image="").order_by("pk")
+                if not options["all"]:
+                    queryset = queryset.filter(placeholder="")
+
+                done = failed = 0
+                last_pk = 0
+                while True:
+                    # Keyset pages: no cursor stays open while we write.
+                    batch = list(
+                        queryset.filter(pk__gt=last_pk).values_list("pk", "image", "post_id")[:batch_size]
+                    )
+                    if not batch:
+                        break
+                    last_pk = batch[-1][0]
+                    ok, bad = self._process(pool, model, batch)
+                    done, failed = done + ok, failed + bad
+                    self.stdout.write(f"{model._meta.label_lower}: {done} done...")
+
+                self.stdout.write(self.style.SUCCESS(
+                    f"{model._meta.label_lower}: {done} updated, {failed} unreadable"
+                ))
+
+    def _process(self, pool, model, rows):
+        names = [name for _, name, _ in rows]
+        results = pool.map(describe_file, names)
+
+        updated, posts = [], set()
+        for (pk, _, post_id), info in zip(rows, results):
+            if info is not None:
+                updated.append(model(pk=pk, **info))
+                posts.add(post_id)
+        model.objects.bulk_update(updated, FIELDS)
+        # bulk_update sends no signals; drop the posts' cached fragments by hand.
+        touch(model._meta.get_field("post").related_model, posts)
+        return len(updated), len(rows) - len(updated)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.sitemaps import build_all
+
+
+class Command(BaseCommand):
+    help = "Write sitemap.xml, its child sitemaps and feed.xml from scratch."
+
+    def handle(self, *args, **options):
+        children = build_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote sitemap index with {children} post sitemaps and feed.xml to {settings.SITEMAP_ROOT}"
+        ))
@@ -0,0 +1,72 @@
+import sys
+
+from django.core import serializers
+from django.core.management.base import BaseCommand
+
+from contact.models import ContactMessage
+from gallery.models import GalleryImage, GalleryPost
+from realty.models import Bedroom, RealtyImage, RealtyPost
+
+# Parents are written before their children so an import can resolve
+# foreign keys batch by batch.
+EXPORT_MODELS = [
+    RealtyPost,
+    Bedroom,
+    RealtyImage,
+    GalleryPost,
+    GalleryImage,
+    ContactMessage,
+]
+
+
+class Command(BaseCommand):
+    help = "Stream realty, gallery and contact data as NDJSON (one object per line)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-o", "--output", default="-",
+            help="File to write to (default: stdout).",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Rows fetched from the database per round trip.",
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=10000,
+            help="Report progress on stderr every N rows.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        self.progress_every = options["progress_every"]
+
+        if options["output"] == "-":
+            stream = sys.stdout
+        else:
+            stream = open(options["output"], "w", encoding="utf-8")
+
+        try:
+            total = 0
+            for model in EXPORT_MODELS:
+                rows = model._default_manager.order_by("pk").iterator(chunk_size=chunk_size)
+                count = self._write(stream, model._meta.label_lower, rows)
+                self.stderr.write(f"{model._meta.label_lower}: {count} exported")
+                total += count
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        self.stderr.write(self.style.SUCCESS(f"Exported {total} objects."))
+
+    def _write(self, stream, label, rows):
+        counter = {"count": 0}
+
+        def counted():
+            for obj in rows:
+                yield obj
+                counter["count"] += 1
+                if counter["count"] % self.progress_every == 0:
+                    self.stderr.write(f"{label}: {counter['count']}...")
+
+        serializers.serialize("jsonl", counted(), stream=stream)
+        return counter["count"]
@@ -0,0 +1,194 @@
+import json
+import sys
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer as PythonDeserializer
+from django.db import connection, transaction
+
+from .export_listings import EXPORT_MODELS
+
+MODELS_BY_LABEL = {model._meta.label_lower: model for model in EXPORT_MODELS}
+
+
+@contextmanager
+def keep_timestamps(models):
+    """bulk_create() runs pre_save(), which would overwrite auto_now /
+    auto_now_add values with the import time. Switch them off meanwhile."""
+    patched = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                patched.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in patched:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Load NDJSON written by export_listings (or dumpdata --format jsonl) "
+        "with batched bulk_create, keeping primary keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="NDJSON file to read ('-' for stdin).")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Objects inserted per bulk_create / transaction.",
+        )
+        parser.add_argument(
+            "--update", action="store_true",
+            help="Overwrite rows whose id already exists instead of failing.",
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=10000,
+            help="Report progress on stderr every N objects.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.update = options["update"]
+        self.progress_every = options["progress_every"]
+        self.counts = {label: 0 for label in MODELS_BY_LABEL}
+        self.orphans = 0
+        self.skipped = 0
+
+        if options["input"] == "-":
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(options["input"], encoding="utf-8")
+            except OSError as exc:
+                raise CommandError(f"Cannot open {options['input']}: {exc}")
+
+        try:
+            with keep_timestamps(EXPORT_MODELS):
+                self._load(stream)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self._reset_sequences()
+        # bulk_create() sends no signals, so recount the facet counters and
+        # rewrite the sitemaps and the similar-listings matrix ourselves.
+        call_command("rebuild_facets", stdout=sys.stderr)
+        call_command("build_sitemaps", stdout=sys.stderr)
+        call_command("build_similar", stdout=sys.stderr)
+
+        for label, count in self.counts.items():
+            if count:
+                self.stderr.write(f"{label}: {count} imported")
+        if self.orphans:
+            self.stderr.write(self.style.WARNING(f"{self.orphans} rows skipped: parent post missing"))
+        if self.skipped:
+            self.stderr.write(f"{self.skipped} rows of other models ignored")
+        self.stderr.write(self.style.SUCCESS(f"Imported {sum(self.counts.values())} objects."))
+
+    def _load(self, stream):
+        model, batch = None, []
+        for lineno, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f"Line {lineno}: invalid JSON ({exc})")
+            if not isinstance(record, dict):
+                raise CommandError(
+                    f"Line {lineno}: expected one object per line. JSON array "
+                    "fixtures such as data.json go through loaddata once, then "
+                    "export_listings."
+                )
+
+            record_model = MODELS_BY_LABEL.get(record.get("model"))
+            if record_model is None:
+                # e.g. sessions.session rows left in old dumpdata fixtures
+                self.skipped += 1
+                continue
+
+            if record_model is not model or len(batch) >= self.batch_size:
+                self._flush(model, batch)
+                model, batch = record_model, []
+            batch.append(record)
+
+        self._flush(model, batch)
+
+    def _flush(self, model, records):
+        if not records:
+            return
+
+        objs = [item.object for item in PythonDeserializer(records)]
+        objs = self._drop_orphans(model, objs)
+
+        with transaction.atomic():
+            if self.update:
+                self._clear_children(model, [obj.pk for obj in objs])
+                update_fields = [
+                    f.name for f in model._meta.concrete_fields if not f.primary_key
+                ]
+                # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+                # and Django refuses unique_fields there.
+                unique_fields = (
+                    ["id"]
+                    if connection.features.supports_update_conflicts_with_target
+                    else None
+                )
+                model._default_manager.bulk_create(
+                    objs,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields,
+                )
+            else:
+                model._default_manager.bulk_create(objs)
+
+        label = model._meta.label_lower
+        before = self.counts[label]
+        self.counts[label] += len(objs)
+        if self.counts[label] // self.progress_every > before // self.progress_every:
+            self.stderr.write(f"{label}: {self.counts[label]}...")
+
+    def _drop_orphans(self, model, objs):
+        """Skip child rows whose post is neither in the database nor in an
+        earlier batch of this import."""
+        post_field = next(
+            (f for f in model._meta.concrete_fields if f.is_relation and f.name == "post"),
+            None,
+        )
+        if post_field is None:
+            return objs
+
+        post_ids = {obj.post_id for obj in objs}
+        existing = set(
+            post_field.related_model._default_manager
+            .filter(pk__in=post_ids)
+            .values_list("pk", flat=True)
+        )
+        kept = [obj for obj in objs if obj.post_id in existing]
+        self.orphans += len(objs) - len(kept)
+        return kept
+
+    def _clear_children(self, model, pks):
+        # With --update the file is the source of truth for a post's images
+        # and bedrooms, so drop the old ones before they are re-inserted.
+        for related in model._meta.related_objects:
+            if related.one_to_many and related.related_model in EXPORT_MODELS:
+                related.related_model._default_manager.filter(
+                    **{f"{related.field.name}__in": pks}
+                ).delete()
+
+    def _reset_sequences(self):
+        # Explicit ids leave PostgreSQL sequences behind; MySQL and SQLite
+        # return no statements here.
+        statements = connection.ops.sequence_reset_sql(no_style(), EXPORT_MODELS)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from gallery.facets import counter as gallery_counter
+from realty.facets import counter as realty_counter
+
+COUNTERS = {
+    "realty": realty_counter,
+    "gallery": gallery_counter,
+}
+
+
+class Command(BaseCommand):
+    help = "Recompute the realty/gallery facet counters and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only verify; exit with status 1 if the counters are out of date.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for name, counter in COUNTERS.items():
+            drift = counter.rebuild(dry_run=options["check"])
+            for (facet, value), (stored, actual) in sorted(drift.items()):
+                self.stdout.write(f"{name} {facet}={value!r}: stored {stored}, actual {actual}")
+            drifted += len(drift)
+
+        if options["check"]:
+            if drifted:
+                self.stderr.write(self.style.ERROR(f"{drifted} facet counters out of date."))
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS("Facet counters are consistent."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Facet counters rebuilt ({drifted} corrected)."))
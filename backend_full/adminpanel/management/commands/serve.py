@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.warmup import format_report, warm_up
+
+CONFIG = os.path.join(settings.BASE_DIR, "gunicorn.conf.py")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the preforking production server (gunicorn, app preloaded and "
+        "warmed up in the master), or print a startup-time report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", help="host:port (default: $GUNICORN_BIND or 0.0.0.0:8000)")
+        parser.add_argument("--workers", type=int, help="Worker processes (default: $WEB_CONCURRENCY)")
+        parser.add_argument("--max-requests", type=int, help="Recycle a worker after N requests")
+        parser.add_argument(
+            "--report", action="store_true",
+            help="Don't serve; show where import and warm-up time goes.",
+        )
+        parser.add_argument("--top", type=int, default=15, help="Packages listed by --report")
+
+    def handle(self, *args, **options):
+        if options["report"]:
+            return self.report(options["top"])
+
+        argv = [sys.executable, "-m", "gunicorn", "-c", CONFIG]
+        if options["bind"]:
+            argv += ["--bind", options["bind"]]
+        if options["workers"]:
+            argv += ["--workers", str(options["workers"])]
+        if options["max_requests"]:
+            argv += ["--max-requests", str(options["max_requests"])]
+        os.execv(sys.executable, argv)
+
+    def report(self, top):
+        # A fresh interpreter shows the real cold-start import cost.
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import backend.wsgi"],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings")},
+            capture_output=True,
+            text=True,
+        )
+        self_us = Counter()
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, _, name = line[len("import time:"):].split("|")
+            self_us[name.strip().split(".")[0]] += int(own)
+
+        self.stdout.write("Import time by top-level package:")
+        total = sum(self_us.values())
+        for package, us in self_us.most_common(top):
+            self.stdout.write(f"  {package:<28} {us / 1000:8.1f} ms")
+        self.stdout.write(f"  {'total':<28} {total / 1000:8.1f} ms")
+
+        self.stdout.write("Warm-up steps:")
+        self.stdout.write(format_report(warm_up()))
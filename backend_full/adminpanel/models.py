@@ -38,3 +38,16 @@ class Admin(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return f"{self.email} ({self.role})"
+
+
+class RevokedToken(models.Model):
+    """A JWT (access or refresh) refused before its expiry, by its jti.
+    Checked through the in-process set in adminpanel.revocation."""
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=20)
+    user = models.ForeignKey(Admin, null=True, blank=True, on_delete=models.CASCADE)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
@@ -0,0 +1,87 @@
+# adminpanel/revocation.py
+"""Revoked JWTs, kept in RevokedToken and checked against an in-process set.
+
+Each process holds the jti of every unexpired revoked token and pulls new
+rows from the table at most every TOKEN_REVOCATION_SYNC_SECONDS, so the
+per-request check is a set lookup instead of a query. A revocation made in
+this process applies at once; other processes see it within one interval.
+The refresh endpoints, which run rarely, ask the table directly.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+# Re-read rows a little older than the last sync: concurrent inserts can
+# commit out of order.
+OVERLAP = timedelta(seconds=60)
+
+
+class RevokedSet:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expires = {}  # jti -> expiry, epoch seconds
+        self._since = None
+        self._synced_at = None  # time.monotonic()
+
+    def _stale(self):
+        return (
+            self._synced_at is None
+            or time.monotonic() - self._synced_at >= settings.TOKEN_REVOCATION_SYNC_SECONDS
+        )
+
+    def __contains__(self, jti):
+        if self._stale():
+            self.sync()
+        return jti in self._expires
+
+    def add(self, jti, expires):
+        with self._lock:
+            self._expires[jti] = expires
+
+    def sync(self):
+        with self._lock:
+            if not self._stale():  # another thread just did it
+                return
+            now = timezone.now()
+            rows = RevokedToken.objects.filter(expires_at__gt=now)
+            if self._since is not None:
+                rows = rows.filter(revoked_at__gte=self._since - OVERLAP)
+            expires = {jti: at.timestamp() for jti, at in rows.values_list("jti", "expires_at")}
+            cutoff = now.timestamp()
+            expires.update((jti, at) for jti, at in self._expires.items() if at > cutoff)
+            self._expires = expires
+            self._since = now
+            self._synced_at = time.monotonic()
+
+
+revoked = RevokedSet()
+
+
+def is_revoked(jti, exact=False):
+    """`exact` asks the table instead of the (up to one interval old) set."""
+    if exact:
+        return jti in revoked or RevokedToken.objects.filter(jti=jti).exists()
+    return jti in revoked
+
+
+def revoke(token):
+    """Revoke a validated simplejwt token until it would have expired anyway."""
+    jti = token[api_settings.JTI_CLAIM]
+    expires = token["exp"]
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "token_type": token.token_type,
+            "user_id": token.get(api_settings.USER_ID_CLAIM),
+            "expires_at": datetime.fromtimestamp(expires, tz=dt_timezone.utc),
+        },
+    )
+    revoked.add(jti, expires)
+    # Expired tokens are refused by their signature check anyway.
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
@@ -36,3 +36,7 @@ class AdminLoginSerializer(serializers.Serializer):
 
         data["user"] = user
         return data
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
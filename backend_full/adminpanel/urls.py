@@ -5,12 +5,28 @@ from .views import (
     AdminListView,
     AdminCreateView,
     AdminDeleteView,
+    admin_events,
+    TokenRefreshView,
+    TokenRotateView,
+    LogoutView,
+    ProfileListView,
+    ProfileDetailView,
+    ProfileStatsView,
+    AdmissionStatsView,
 )
 
 urlpatterns = [
     path("login/", AdminLoginView.as_view(), name="admin-login"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="admin-token-refresh"),
+    path("token/rotate/", TokenRotateView.as_view(), name="admin-token-rotate"),
+    path("logout/", LogoutView.as_view(), name="admin-logout"),
     path("me/", AdminMeView.as_view(), name="admin-me"),
     path("users/", AdminListView.as_view(), name="admin-list"),
     path("create/", AdminCreateView.as_view(), name="admin-create"),
     path("delete/<int:pk>/", AdminDeleteView.as_view(), name="admin-delete"),
+    path("events/", admin_events, name="admin-events"),
+    path("admission/", AdmissionStatsView.as_view(), name="admin-admission"),
+    path("profiles/", ProfileListView.as_view(), name="admin-profiles"),
+    path("profiles/<str:profile_id>/", ProfileDetailView.as_view(), name="admin-profile"),
+    path("profiles/<str:profile_id>/pstats/", ProfileStatsView.as_view(), name="admin-profile-pstats"),
 ]
@@ -1,10 +1,22 @@
+import json
+import time
+
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from backend import admission, profiling
+from backend.events import broker
 
+from .authentication import RevocableJWTAuthentication
 from .models import Admin
-from .serializers import AdminLoginSerializer, AdminSerializer
+from .revocation import is_revoked, revoke
+from .serializers import AdminLoginSerializer, AdminSerializer, RefreshTokenSerializer
 from django.contrib.auth import get_user_model
 
 AdminUser = get_user_model()
@@ -110,3 +122,177 @@ class AdminDeleteView(APIView):
             return Response(
                 {"error": "Admin not found"}, status=status.HTTP_404_NOT_FOUND
             )
+
+
+def _refresh_token(request, allow_revoked=False):
+    """(RefreshToken, user) from {"refresh": ...}, or (None, error Response)."""
+    serializer = RefreshTokenSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        refresh = RefreshToken(serializer.validated_data["refresh"])
+    except TokenError:
+        return None, Response(
+            {"error": "Refresh token is invalid or expired"}, status=status.HTTP_401_UNAUTHORIZED
+        )
+    # Refreshing is rare, so ask the table rather than this process's copy.
+    if not allow_revoked and is_revoked(refresh[jwt_settings.JTI_CLAIM], exact=True):
+        return None, Response(
+            {"error": "Refresh token has been revoked"}, status=status.HTTP_401_UNAUTHORIZED
+        )
+    user = AdminUser.objects.filter(pk=refresh[jwt_settings.USER_ID_CLAIM], is_active=True).first()
+    if user is None:
+        return None, Response(
+            {"error": "User not found or inactive"}, status=status.HTTP_401_UNAUTHORIZED
+        )
+    return refresh, user
+
+
+# ✅ TOKEN REFRESH / ROTATION / LOGOUT
+# No authentication classes: the refresh token is the credential, and the
+# (usually expired) access token in the header must not turn these into 401s.
+class TokenRefreshView(APIView):
+    """POST /api/admin/token/refresh/ — New access token for a valid refresh token"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        refresh, user = _refresh_token(request)
+        if refresh is None:
+            return user
+        return Response({"token": str(refresh.access_token)}, status=status.HTTP_200_OK)
+
+
+class TokenRotateView(APIView):
+    """POST /api/admin/token/rotate/ — New access and refresh tokens; the old refresh token stops working"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        refresh, user = _refresh_token(request)
+        if refresh is None:
+            return user
+        if settings.SIMPLE_JWT.get("BLACKLIST_AFTER_ROTATION"):
+            revoke(refresh)
+        new_refresh = RefreshToken.for_user(user)
+        return Response(
+            {"token": str(new_refresh.access_token), "refresh": str(new_refresh)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class LogoutView(APIView):
+    """POST /api/admin/logout/ — Revoke the refresh token and the access token in the header"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        refresh, user = _refresh_token(request, allow_revoked=True)
+        if refresh is None:
+            return user
+        revoke(refresh)
+
+        auth = RevocableJWTAuthentication()
+        header = auth.get_header(request)
+        raw_token = auth.get_raw_token(header) if header is not None else None
+        if raw_token:
+            try:
+                revoke(AccessToken(raw_token))
+            except TokenError:
+                pass  # already expired or not ours: nothing to revoke
+        return Response({"message": "Logged out successfully"}, status=status.HTTP_200_OK)
+
+
+def _stream_user(request):
+    """JWT from the Authorization header, or ?token= because the browser's
+    EventSource cannot send headers."""
+    auth = RevocableJWTAuthentication()
+    raw_token = None
+    header = auth.get_header(request)
+    if header is not None:
+        raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        raw_token = request.GET.get("token")
+    if not raw_token:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError):
+        return None
+
+
+# ✅ LIVE CHANGE EVENTS (Server-Sent Events)
+def admin_events(request):
+    """GET /api/admin/events/ — Stream of created/updated/deleted messages and posts
+
+    A plain generator, so each stream holds one gunicorn thread; the
+    "streams" admission class caps how many are open. A stream ends after
+    EVENTS_STREAM_SECONDS and the browser's EventSource reconnects with
+    Last-Event-ID.
+    """
+    user = _stream_user(request)
+    if user is None or getattr(user, "role", None) != "admin":
+        return JsonResponse({"error": "Admin authentication required"}, status=401)
+
+    subscription = broker.subscribe(request.headers.get("Last-Event-ID"))
+
+    def stream():
+        deadline = time.monotonic() + settings.EVENTS_STREAM_SECONDS
+        try:
+            yield "retry: 1000\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                event = subscription.get(timeout=min(remaining, settings.EVENTS_KEEPALIVE_SECONDS))
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps({key: event[key] for key in ("model", "action", "ids")})
+                yield f"id: {event['id']}\nevent: {event['action']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # let nginx pass events through immediately
+    return response
+
+
+# ✅ ADMISSION CONTROL (see backend/admission.py)
+class AdmissionStatsView(APIView):
+    """GET /api/admin/admission/ — Limits, in-flight and queued requests per route class"""
+    permission_classes = [IsAdminUserRole]
+
+    def get(self, request):
+        return Response(admission.stats(), status=status.HTTP_200_OK)
+
+
+# ✅ REQUEST PROFILES (X-Profile: 1 | cprofile, see backend/profiling.py)
+class ProfileListView(APIView):
+    """GET /api/admin/profiles/ — Recently profiled requests, newest first"""
+    permission_classes = [IsAdminUserRole]
+
+    def get(self, request):
+        return Response(profiling.recent(), status=status.HTTP_200_OK)
+
+
+class ProfileDetailView(APIView):
+    """GET /api/admin/profiles/<id>/ — SQL timeline and time breakdown of one request"""
+    permission_classes = [IsAdminUserRole]
+
+    def get(self, request, profile_id):
+        report = profiling.load(profile_id)
+        if report is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class ProfileStatsView(APIView):
+    """GET /api/admin/profiles/<id>/pstats/ — cProfile dump (open with pstats or snakeviz)"""
+    permission_classes = [IsAdminUserRole]
+
+    def get(self, request, profile_id):
+        path = profiling.pstats_path(profile_id)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.prof")
@@ -0,0 +1,244 @@
+# backend/admission.py
+"""Admission control: concurrency limits for classes of expensive routes.
+
+ADMISSION_RULES map (method, URL name) pairs to a class from
+ADMISSION_CLASSES. Each class runs at most `limit` requests at a time
+across all workers. Up to `queue` more requests wait up to `wait` seconds
+for a free slot. Anything beyond that gets 503 with Retry-After right away,
+so uploads or SMTP-bound contact posts can't occupy every worker while the
+public GETs queue behind them. Routes without a rule pass straight through.
+
+Slots are numbered lock files in ADMISSION_ROOT held with flock(). Gunicorn
+workers are separate processes, so an in-process semaphore would limit
+nothing; flock works across processes and threads alike, and the kernel
+drops the lock of a worker that dies, so a killed worker never leaks a
+slot. Waiting requests poll with backoff, so the queue is bounded but not
+strictly first come, first served. A waiting request still occupies its
+worker thread, so keep `queue` at 0 to turn the overflow away at once
+unless the server has threads to spare.
+"""
+import os
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+try:
+    import fcntl
+except ImportError:  # Windows: per-process limits only
+    fcntl = None
+
+POLL_MIN = 0.01
+POLL_MAX = 0.2
+
+
+class _Slots:
+    """`size` slots shared by every process; acquire() returns a token to
+    pass to release(), or None when all are taken."""
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self._semaphore = threading.BoundedSemaphore(size) if fcntl is None else None
+
+    def _path(self, i):
+        return os.path.join(settings.ADMISSION_ROOT, f"{self.name}.{i}.lock")
+
+    def acquire(self):
+        if not self.size:
+            return None
+        if fcntl is None:
+            return True if self._semaphore.acquire(blocking=False) else None
+        os.makedirs(settings.ADMISSION_ROOT, exist_ok=True)
+        first = random.randrange(self.size)  # spread contention over the files
+        for n in range(self.size):
+            # A fresh open file each time: flock() on a shared one wouldn't
+            # keep two threads of this process apart.
+            lock_file = open(self._path((first + n) % self.size), "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            # The holder's pid, so held() can count slots without locking.
+            lock_file.truncate(0)
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+            return lock_file
+        return None
+
+    def release(self, token):
+        if fcntl is None:
+            self._semaphore.release()
+        else:
+            token.truncate(0)
+            token.close()  # closing drops the lock
+
+    def held(self):
+        """Slots in use. Reads the pids the holders wrote instead of probing
+        the locks, which would make a concurrent acquire() fail."""
+        if fcntl is None:
+            return self.size - self._semaphore._value
+        count = 0
+        for i in range(self.size):
+            try:
+                with open(self._path(i)) as lock_file:
+                    owner = lock_file.read()
+            except FileNotFoundError:
+                continue
+            # A killed worker leaves its pid behind but not its lock.
+            if owner.isdigit() and _alive(int(owner)):
+                count += 1
+        return count
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # alive, owned by another user
+    return True
+
+
+class Gate:
+    def __init__(self, name, limit, queue=0, wait=0, retry_after=5):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.wait = wait
+        self.retry_after = retry_after
+        self.slots = _Slots(name, limit)
+        self.waiting = _Slots(f"{name}.queue", queue)
+
+    def enter(self):
+        """A slot token, or None if the request has to be turned away."""
+        slot = self.slots.acquire()
+        if slot is not None:
+            return slot
+        ticket = self.waiting.acquire()
+        if ticket is None:
+            return None
+        try:
+            deadline = time.monotonic() + self.wait
+            delay = POLL_MIN
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                time.sleep(min(delay * random.uniform(0.5, 1.0), remaining))
+                slot = self.slots.acquire()
+                if slot is not None:
+                    return slot
+                delay = min(delay * 2, POLL_MAX)
+        finally:
+            self.waiting.release(ticket)
+
+    def leave(self, slot):
+        self.slots.release(slot)
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "wait_seconds": self.wait,
+            "in_flight": self.slots.held(),
+            "queued": self.waiting.held(),
+        }
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def _load():
+    """(gates by class, gate by (method, URL name), methods with a rule)."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            gates = {name: Gate(name, **options) for name, options in settings.ADMISSION_CLASSES.items()}
+            routes = {
+                (method, url_name): gates[name]
+                for name, methods, url_names in settings.ADMISSION_RULES
+                for method in methods
+                for url_name in url_names
+            }
+            _config = (gates, routes, {method for method, _ in routes})
+        return _config
+
+
+def stats():
+    """In-flight and queued requests per class, across all workers."""
+    gates, _, _ = _config or _load()
+    return {name: gate.stats() for name, gate in gates.items()}
+
+
+def _gate_for(request):
+    _, routes, methods = _config or _load()
+    if request.method not in methods:
+        return None
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    return routes.get((request.method, match.url_name))
+
+
+def _busy(request, gate):
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        # An EventSource reads the retry: field, not Retry-After.
+        response = HttpResponse(
+            f"retry: {gate.retry_after * 1000}\n\n", content_type="text/event-stream", status=503
+        )
+    else:
+        response = JsonResponse(
+            {"error": "The server is busy with requests like this one; try again shortly."},
+            status=503,
+        )
+    response["Retry-After"] = str(gate.retry_after)
+    return response
+
+
+class AdmissionMiddleware:
+    """Put early in MIDDLEWARE (after CORS) so a turned-away request costs little."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        gate = _gate_for(request)
+        if gate is None:
+            return self.get_response(request)
+        slot = gate.enter()
+        if slot is None:
+            return _busy(request, gate)
+        try:
+            return self.get_response(request)
+        finally:
+            gate.leave(slot)
+
+    async def __acall__(self, request):
+        gate = _gate_for(request)
+        if gate is None:
+            return await self.get_response(request)
+        # Waiting sleeps; keep it off the event loop and the main sync thread.
+        slot = await sync_to_async(gate.enter, thread_sensitive=False)()
+        if slot is None:
+            return _busy(request, gate)
+        try:
+            return await self.get_response(request)
+        finally:
+            gate.leave(slot)
@@ -0,0 +1,219 @@
+# backend/compression.py
+"""gzip / brotli compression of text responses (mostly the JSON API).
+
+The encoding is negotiated from Accept-Encoding: brotli when the client
+takes it and the `brotli` package is installed, else gzip. Bodies under
+COMPRESSION_MIN_SIZE and content types outside COMPRESSION_TYPES go out as
+they are. Streaming responses are compressed chunk by chunk; Server-Sent
+Events are not in COMPRESSION_TYPES and are never touched.
+
+Bodies that carry credentials are never compressed, since compressing a
+secret next to attacker-influenced text leaks it through the length
+(BREACH): the views named in COMPRESSION_EXCLUDE_URL_NAMES (login and the
+JWT token endpoints) and any page that rendered the CSRF token.
+
+Buffered 200 responses to GET/HEAD get an ETag from a hash of the
+uncompressed body unless the view set one, with the encoding appended
+("<hash>-br") so every representation has its own strong validator. A
+matching If-None-Match is answered with 304 before anything is compressed.
+The same hash keys a small in-process LRU of compressed bodies, so a
+response that hasn't changed (a list served from the fragment cache, say)
+is compressed once and reused on every later hit.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+CODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    """The coding to use for this Accept-Encoding header, or None."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip()] = q
+    star = weights.get("*", 0.0)
+    # Highest q wins; max() keeps the first on a tie, so brotli.
+    coding = max(CODINGS, key=lambda coding: weights.get(coding, star))
+    return coding if weights.get(coding, star) > 0 else None
+
+
+def compress(data, coding):
+    if coding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0: the same body always gives the same bytes.
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _Stream:
+    """Incremental compressor; every chunk is flushed so streaming stays live."""
+
+    def __init__(self, coding):
+        self.coding = coding
+        if coding == "br":
+            self.compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        if self.coding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def end(self):
+        if self.coding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def _compress_stream(chunks, coding):
+    stream = _Stream(coding)
+    for chunk in chunks:
+        data = stream.chunk(chunk)
+        if data:
+            yield data
+    yield stream.end()
+
+
+async def _acompress_stream(chunks, coding):
+    stream = _Stream(coding)
+    async for chunk in chunks:
+        data = stream.chunk(chunk)
+        if data:
+            yield data
+    yield stream.end()
+
+
+class CompressedBodies:
+    """(body hash, coding) -> compressed bytes, least recently used evicted
+    once the total passes COMPRESSION_CACHE_BYTES."""
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        limit = settings.COMPRESSION_CACHE_BYTES
+        if len(value) > limit // 8:
+            return  # one huge body would push everything else out
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = value
+            self._size += len(value)
+            while self._size > limit:
+                _, old = self._items.popitem(last=False)
+                self._size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+bodies = CompressedBodies()
+
+
+def _carries_secrets(request):
+    match = getattr(request, "resolver_match", None)
+    if match is not None and match.url_name in settings.COMPRESSION_EXCLUDE_URL_NAMES:
+        return True
+    # Set by django.middleware.csrf.get_token(), e.g. {% csrf_token %}.
+    return bool(request.META.get("CSRF_COOKIE_NEEDS_UPDATE"))
+
+
+def _compressible(response):
+    if response.has_header("Content-Encoding") or response.status_code in (204, 206, 304):
+        return False
+    if "no-transform" in response.get("Cache-Control", "").lower():
+        return False
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type in settings.COMPRESSION_TYPES
+
+
+def _weaken_etag(response):
+    etag = response.get("ETag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Put near the top of MIDDLEWARE so it sees the finished response body."""
+
+    def process_response(self, request, response):
+        if not _compressible(response) or _carries_secrets(request):
+            return response
+        if response.streaming:
+            return self._stream(request, response)
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+
+        if response.has_header("ETag"):
+            # The view's validator names the uncompressed body; a compressed
+            # copy is only equivalent to it, not byte-identical.
+            if coding:
+                _weaken_etag(response)
+        elif request.method in ("GET", "HEAD") and response.status_code == 200:
+            response.headers["ETag"] = f'"{digest}-{coding}"' if coding else f'"{digest}"'
+            conditional = get_conditional_response(request, etag=response["ETag"], response=response)
+            if conditional is not response:
+                return conditional  # 304 (or 412 for a failed If-Match)
+
+        if not coding:
+            return response
+        compressed = bodies.get((digest, coding))
+        if compressed is None:
+            compressed = compress(response.content, coding)
+            bodies.put((digest, coding), compressed)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = coding
+        return response
+
+    def _stream(self, request, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if not coding:
+            return response
+        _weaken_etag(response)
+        if response.is_async:
+            response.streaming_content = _acompress_stream(response.streaming_content, coding)
+        else:
+            response.streaming_content = _compress_stream(response.streaming_content, coding)
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = coding
+        return response
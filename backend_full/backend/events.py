@@ -0,0 +1,179 @@
+# backend/events.py
+"""Change notifications for the admin Server-Sent Events stream.
+
+Model signals publish {"model", "action", "ids"} events through the
+configured backend (settings.EVENTS_BACKEND). The backend delivers them to
+the Broker of every process, which fans them out to the open SSE streams.
+"""
+import json
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+
+RESYNC = {"model": "*", "action": "resync", "ids": []}
+
+
+class Subscription:
+    """One open stream: a queue fed from any thread."""
+
+    def __init__(self, broker, backlog):
+        self.broker = broker
+        self.queue = queue.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        for event in backlog:
+            self.deliver(event)
+
+    def deliver(self, event):
+        with self._lock:
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                # The client is too slow; tell it to refetch instead of queueing more.
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(dict(RESYNC, id=event["id"]))
+
+    def get(self, timeout):
+        """The next event, or None if none arrives within `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Per-process fan-out to the open streams, with a short replay buffer so
+    a reconnecting EventSource (Last-Event-ID) does not miss anything."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # Event ids are only meaningful within one process: a forked worker
+        # (gunicorn preload_app) gets its own boot id and history, so a
+        # reconnect to another worker resyncs instead of replaying the wrong
+        # events.
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._subscribers = set()
+        self._history = deque(maxlen=settings.EVENTS_HISTORY)
+
+    def dispatch(self, event):
+        with self._lock:
+            self._seq += 1
+            event = dict(event, id=f"{self.boot_id}-{self._seq}")
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, last_event_id=None):
+        get_backend().start()
+        with self._lock:
+            backlog = self._backlog(last_event_id)
+            subscription = Subscription(self, backlog)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _backlog(self, last_event_id):
+        if not last_event_id:
+            return []
+        boot_id, _, seq = last_event_id.partition("-")
+        if boot_id != self.boot_id or not seq.isdigit():
+            # Another process or a restart: we can't know what was missed.
+            return [dict(RESYNC, id=f"{self.boot_id}-{self._seq}")]
+        seq = int(seq)
+        oldest = self._history[0]["id"] if self._history else None
+        if oldest and int(oldest.partition("-")[2]) > seq + 1:
+            return [dict(RESYNC, id=f"{self.boot_id}-{self._seq}")]
+        return [event for event in self._history if int(event["id"].partition("-")[2]) > seq]
+
+
+broker = Broker()
+if hasattr(os, "register_at_fork"):  # not on Windows
+    os.register_at_fork(after_in_child=broker._reset)
+
+
+class LocalBackend:
+    """Single process (runserver, one worker, tests)."""
+
+    def start(self):
+        pass
+
+    def publish(self, event):
+        broker.dispatch(event)
+
+
+class RedisBackend:
+    """Redis pub/sub between processes. Needs the optional `redis` package."""
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("EVENTS_BACKEND=RedisBackend requires `pip install redis`.")
+        self.client = redis.Redis.from_url(settings.EVENTS_REDIS_URL)
+        self.channel = settings.EVENTS_REDIS_CHANNEL
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Started lazily by the first stream, so never in a pre-fork master.
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            broker.dispatch(json.loads(message["data"]))
+
+    def publish(self, event):
+        self.client.publish(self.channel, json.dumps(event))
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.EVENTS_BACKEND)()
+
+
+def publish(model, action, ids):
+    """Send an event once the current transaction commits."""
+    event = {"model": model._meta.label_lower, "action": action, "ids": list(ids)}
+    transaction.on_commit(lambda: get_backend().publish(event), robust=True)
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(sender, "created" if created else "updated", [instance.pk])
+
+
+def _on_delete(sender, instance, **kwargs):
+    publish(sender, "deleted", [instance.pk])
+
+
+def connect_signals():
+    for label in settings.EVENT_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f"events-{label}")
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f"events-{label}")
@@ -0,0 +1,153 @@
+# backend/facets.py
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_save
+
+
+def same(value):
+    return value or None
+
+
+class FacetCounter:
+    """Keeps per-facet row counts for `model` in `counter_model`.
+
+    `facets` maps a facet name to (source field, transform). The transform
+    turns the stored value into the facet bucket, or None to not count it.
+    Counters are adjusted on every save/delete, so reading them is a single
+    small query instead of a GROUP BY over the whole table. Bulk writes skip
+    signals; pass their rows to adjust(), or run `manage.py rebuild_facets`
+    after them.
+    """
+
+    def __init__(self, model, counter_model, facets):
+        self.model = model
+        self.counter_model = counter_model
+        self.facets = facets
+        self.source_fields = sorted({field for field, _ in facets.values()})
+
+    def connect(self):
+        uid = f"facets-{self.model._meta.label_lower}"
+        pre_save.connect(self._pre_save, sender=self.model, dispatch_uid=uid)
+        post_save.connect(self._post_save, sender=self.model, dispatch_uid=uid)
+        post_delete.connect(self._post_delete, sender=self.model, dispatch_uid=uid)
+
+    def buckets(self, values):
+        result = {}
+        for name, (field, transform) in self.facets.items():
+            bucket = transform(values.get(field))
+            if bucket is not None:
+                result[name] = str(bucket)
+        return result
+
+    def _values(self, instance):
+        return {field: getattr(instance, field) for field in self.source_fields}
+
+    def _pre_save(self, sender, instance, raw=False, **kwargs):
+        instance._facet_old = None
+        if raw or instance._state.adding or instance.pk is None:
+            return
+        old = sender._default_manager.filter(pk=instance.pk).values(*self.source_fields).first()
+        if old is not None:
+            instance._facet_old = self.buckets(old)
+
+    def _post_save(self, sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        old = getattr(instance, "_facet_old", None) or {}
+        new = self.buckets(self._values(instance))
+        changes = Counter()
+        for name in self.facets:
+            if old.get(name) == new.get(name):
+                continue
+            if name in old:
+                changes[(name, old[name])] -= 1
+            if name in new:
+                changes[(name, new[name])] += 1
+        self._apply(changes)
+
+    def _post_delete(self, sender, instance, **kwargs):
+        changes = Counter(
+            {(name, bucket): -1 for name, bucket in self.buckets(self._values(instance)).items()}
+        )
+        self._apply(changes)
+
+    def adjust(self, removed=(), added=()):
+        """Account for a bulk write. `removed` and `added` are dicts of the
+        source fields (e.g. from .values()) before and after it."""
+        changes = Counter()
+        for values in removed:
+            for name, bucket in self.buckets(values).items():
+                changes[(name, bucket)] -= 1
+        for values in added:
+            for name, bucket in self.buckets(values).items():
+                changes[(name, bucket)] += 1
+        self._apply(changes)
+
+    def _apply(self, changes):
+        if not changes:
+            return
+        manager = self.counter_model._default_manager
+        with transaction.atomic():
+            for (facet, value), delta in changes.items():
+                if not delta:
+                    continue
+                rows = manager.filter(facet=facet, value=value)
+                if not rows.update(count=F("count") + delta):
+                    manager.get_or_create(facet=facet, value=value, defaults={"count": 0})
+                    rows.update(count=F("count") + delta)
+
+    def counts(self):
+        result = {name: {} for name in self.facets}
+        rows = (
+            self.counter_model._default_manager
+            .filter(count__gt=0)
+            .order_by("facet", "-count", "value")
+            .values_list("facet", "value", "count")
+        )
+        for facet, value, count in rows:
+            if facet in result:
+                result[facet][value] = count
+        return result
+
+    def compute(self):
+        """Recount every facet from the source table (GROUP BY per field)."""
+        fresh = Counter()
+        for name, (field, transform) in self.facets.items():
+            grouped = (
+                self.model._default_manager
+                .order_by()
+                .values(field)
+                .annotate(n=Count("pk"))
+                .values_list(field, "n")
+            )
+            for value, n in grouped:
+                bucket = transform(value)
+                if bucket is not None:
+                    fresh[(name, str(bucket))] += n
+        return fresh
+
+    def stored(self):
+        rows = self.counter_model._default_manager.values_list("facet", "value", "count")
+        return Counter({(facet, value): count for facet, value, count in rows if count})
+
+    def rebuild(self, dry_run=False):
+        """Recompute the counters and return {(facet, value): (stored, actual)}
+        for every counter that had drifted."""
+        with transaction.atomic():
+            fresh = self.compute()
+            stored = self.stored()
+            drift = {
+                key: (stored.get(key, 0), fresh.get(key, 0))
+                for key in set(stored) | set(fresh)
+                if stored.get(key, 0) != fresh.get(key, 0)
+            }
+            if not dry_run:
+                manager = self.counter_model._default_manager
+                manager.all().delete()
+                manager.bulk_create(
+                    self.counter_model(facet=facet, value=value, count=count)
+                    for (facet, value), count in fresh.items()
+                )
+        return drift
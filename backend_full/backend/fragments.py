@@ -0,0 +1,69 @@
+# backend/fragments.py
+"""Per-post cache of serialized representations.
+
+Keys carry the post's updated_at, so an edit simply makes the old entry
+unreachable and nothing has to be invalidated. A list is rendered with one
+cheap (id, updated_at) query plus one get_many(); only the misses are loaded
+(with their prefetches) and serialized.
+
+Images and bedrooms are part of a post's fragment, so writing one of them
+bumps the post's updated_at (see connect_children).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+
+class FragmentCache:
+    def __init__(self, name, queryset, serializer_class):
+        self.name = name
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+
+    def _key(self, request, pk, updated_at):
+        # Image URLs are absolute, so the origin is part of the representation.
+        return (
+            f"fragment:{self.name}:v{settings.FRAGMENT_CACHE_VERSION}:"
+            f"{request.scheme}://{request.get_host()}:{pk}:{updated_at.timestamp()}"
+        )
+
+    def render(self, rows, request):
+        """Representations for [(pk, updated_at), ...], in the same order."""
+        keys = [self._key(request, pk, updated_at) for pk, updated_at in rows]
+        found = cache.get_many(keys)
+
+        missing = [pk for (pk, _), key in zip(rows, keys) if key not in found]
+        if missing:
+            posts = self.queryset.in_bulk(missing)
+            fresh = {
+                key: self.serializer_class(posts[pk], context={"request": request}).data
+                for (pk, _), key in zip(rows, keys)
+                if key not in found and pk in posts
+            }
+            cache.set_many(fresh, settings.FRAGMENT_CACHE_TIMEOUT)
+            found.update(fresh)
+
+        # A post deleted between the two queries is just left out.
+        return [found[key] for key in keys if key in found]
+
+    def render_queryset(self, queryset, request):
+        return self.render(list(queryset.values_list("pk", "updated_at")), request)
+
+
+def touch(post_model, ids):
+    """Give posts a new updated_at (and so a new fragment key) without save()."""
+    post_model.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+def _touch_parent(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch(sender._meta.get_field("post").related_model, [instance.post_id])
+
+
+def connect_children(*models):
+    """Models with a `post` foreign key whose writes must bump the post."""
+    for model in models:
+        uid = f"fragments-{model._meta.label_lower}"
+        post_save.connect(_touch_parent, sender=model, dispatch_uid=uid)
+        post_delete.connect(_touch_parent, sender=model, dispatch_uid=uid)
@@ -0,0 +1,149 @@
+# backend/images.py
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .fragments import touch
+
+EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp"}
+
+
+def encode(img, fmt, quality):
+    buffer = BytesIO()
+    if fmt == "WEBP":
+        img.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        # No exif= argument: the re-encoded file carries no metadata.
+        img.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def describe(img, size=None):
+    """Placeholder fields for a decoded image: a tiny inline WebP preview,
+    the dominant colour and the aspect ratio. `size` overrides img.size when
+    the image was decoded at reduced scale."""
+    width, height = size or img.size
+    preview_side = settings.IMAGE_PLACEHOLDER_SIZE
+
+    small = img.convert("RGB")
+    small.thumbnail((preview_side, preview_side), Image.BILINEAR)
+    buffer = BytesIO()
+    small.save(buffer, "WEBP", quality=40)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    quantized = small.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+
+    return {
+        "placeholder": placeholder,
+        "dominant_color": f"#{r:02x}{g:02x}{b:02x}",
+        "aspect_ratio": round(width / height, 4) if height else None,
+    }
+
+
+def describe_file(name):
+    """Placeholder, dimensions and size for a stored file, or None if it
+    cannot be read. Needs no models, so it can run in worker threads."""
+    try:
+        with default_storage.open(name) as f:
+            img = Image.open(f)
+            width, height = img.size
+            if img.getexif().get(0x0112) in (5, 6, 7, 8):  # rotated 90/270
+                width, height = height, width
+            # Decoding at 1/8 scale is plenty for a 16px preview.
+            img.draft("RGB", (settings.IMAGE_PLACEHOLDER_SIZE * 4,) * 2)
+            img = ImageOps.exif_transpose(img)
+            info = describe(img, (width, height))
+            info.update(width=width, height=height, bytes=default_storage.size(name))
+            return info
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def optimize_image(instance, field_name="image"):
+    """Re-encode a freshly uploaded image before it reaches storage.
+
+    Applies the EXIF orientation, drops all metadata, downscales to
+    IMAGE_MAX_DIMENSION and stores progressive JPEG (or WebP) at
+    IMAGE_QUALITY. Sets width/height/bytes and the placeholder fields on the
+    instance. Files Pillow cannot read are stored untouched.
+    """
+    upload = getattr(instance, field_name)
+    max_dim = settings.IMAGE_MAX_DIMENSION
+    fmt = settings.IMAGE_OUTPUT_FORMAT
+
+    try:
+        upload.seek(0)
+        img = Image.open(upload)
+        # Let the JPEG decoder scale down by 1/2..1/8 while decoding.
+        img.draft("RGB", (max_dim, max_dim))
+        img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        instance.width = instance.height = None
+        instance.bytes = upload.size
+        return
+
+    if fmt == "WEBP" and img.has_transparency_data:
+        img = img.convert("RGBA")
+    elif img.has_transparency_data:
+        # JPEG has no alpha: flatten onto white rather than black.
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.getchannel("A"))
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+
+    data = encode(img, fmt, settings.IMAGE_QUALITY)
+    name = os.path.splitext(os.path.basename(upload.name))[0] + EXTENSIONS[fmt]
+    setattr(instance, field_name, ContentFile(data, name=name))
+
+    instance.width, instance.height = img.size
+    instance.bytes = len(data)
+    for field, value in describe(img).items():
+        setattr(instance, field, value)
+
+
+def create_images(model, post, images):
+    """Create `model` rows for `post` from uploaded files and/or URL strings.
+
+    Uploads go through optimize_image() and into storage on a pool of
+    IMAGE_UPLOAD_WORKERS threads (Pillow and storage I/O release the GIL),
+    then every row is inserted with one bulk_create. If anything fails the
+    files already written are deleted and the error is raised, so the
+    caller's transaction rolls back with nothing left behind.
+    """
+    instances = [model(post=post, image=image) for image in images]
+    if not instances:
+        return []
+    field = model._meta.get_field("image")
+    uploads = [instance for instance in instances if instance.image and not instance.image._committed]
+
+    def store(instance):
+        optimize_image(instance)
+        field.pre_save(instance, add=True)  # writes the file, as save() would
+        return instance.image.name
+
+    with ThreadPoolExecutor(max_workers=max(1, min(settings.IMAGE_UPLOAD_WORKERS, len(uploads)))) as pool:
+        futures = [pool.submit(store, instance) for instance in uploads]
+    stored = [future.result() for future in futures if future.exception() is None]
+    try:
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+        model.objects.bulk_create(instances)
+    except Exception:
+        for name in stored:
+            field.storage.delete(name)
+        raise
+
+    # bulk_create sends no signals: refresh the post's cached fragment here.
+    touch(type(post), [post.pk])
+    return instances
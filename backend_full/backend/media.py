@@ -0,0 +1,142 @@
+# backend/media.py
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """Read at most `length` bytes from an already positioned file.
+
+    Deliberately has no fileno()/seek() so WSGI servers fall back to
+    read() instead of sending the whole file with sendfile().
+    """
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def make_etag(stat):
+    # Size + mtime changes whenever the file is replaced, like nginx/Apache.
+    return '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+
+
+def parse_range(header, size):
+    """Return (start, end) inclusive for a single byte range, None to ignore
+    the header, or False when the range cannot be satisfied."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple ranges or another unit: serving the full body is allowed.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+@require_safe
+def serve_media(request, path):
+    """GET /media/<path> — Serve uploaded realty/gallery images.
+
+    Supports strong ETags, If-None-Match, single byte ranges and, depending on
+    MEDIA_SERVE_MODE, hands the transfer off to nginx or Apache.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found")
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404("Media file not found")
+    if not os.path.isfile(fullpath):
+        raise Http404("Media file not found")
+
+    etag = make_etag(stat)
+    content_type = mimetypes.guess_type(fullpath)[0] or "application/octet-stream"
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}",
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and (if_none_match.strip() == "*" or etag in parse_etags(if_none_match)):
+        response = HttpResponse(status=304)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    mode = settings.MEDIA_SERVE_MODE
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        # The front proxy streams the bytes (and handles Range itself).
+        response = HttpResponse(content_type=content_type)
+        if mode == "x-accel-redirect":
+            relpath = os.path.relpath(fullpath, settings.MEDIA_ROOT).replace(os.sep, "/")
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + relpath
+        else:
+            response["X-Sendfile"] = fullpath
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header:
+        # If-Range: only honour the range when the client's copy is current.
+        if_range = request.META.get("HTTP_IF_RANGE")
+        if not if_range or if_range.strip() == etag:
+            byte_range = parse_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    f = open(fullpath, "rb")
+    if byte_range:
+        start, end = byte_range
+        f.seek(start)
+        response = FileResponse(RangeFile(f, end - start + 1), status=206, content_type=content_type)
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    else:
+        # A plain file object lets the WSGI server use sendfile().
+        response = FileResponse(f, content_type=content_type)
+
+    for key, value in headers.items():
+        response[key] = value
+    return response
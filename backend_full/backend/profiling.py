@@ -0,0 +1,271 @@
+# backend/profiling.py
+"""Opt-in request profiling for admins.
+
+An admin-role user (admin session or JWT) who sends `X-Profile: 1` or
+`?_profile=1` gets the request profiled: every SQL statement on a timeline
+with exact duplicates and repeated statements flagged, and the time split
+between SQL, serializers, the rest of the view and rendering. `cprofile`
+instead of `1` also runs cProfile and keeps the pstats dump.
+
+The report is written to PROFILING_ROOT; the response carries its id in
+X-Profile-Id and a summary in Server-Timing (shown by browser dev tools).
+Fetch it from /api/admin/profiles/<id>/.
+
+Requests without the trigger cost a header lookup and a substring test.
+The serializer timer is patched into DRF on the first profiled request and
+is a context-variable check after that.
+"""
+import asyncio
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.serializers import BaseSerializer
+
+from adminpanel.authentication import RevocableJWTAuthentication
+
+HEADER = "HTTP_X_PROFILE"
+PARAM = "_profile"
+MODES = {"1", "true", "cprofile"}
+ID_RE = re.compile(r"[0-9a-f]{12}")
+
+_active = contextvars.ContextVar("profile", default=None)
+_patch_lock = threading.Lock()
+_patched = False
+
+
+class Profile:
+    def __init__(self, request, mode):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+        self.started = time.perf_counter()
+        self.queries = []
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.view_seconds = None
+
+    def sql_wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append({
+                    "alias": alias,
+                    "start_ms": _ms(start - self.started),
+                    "duration_ms": _ms(time.perf_counter() - start),
+                    "sql": sql,
+                    "many": many,
+                    "params_key": repr(params),
+                })
+        return wrapper
+
+    def report(self, status_code, total):
+        exact = Counter((q["sql"], q.pop("params_key")) for q in self.queries)
+        same_sql = Counter(q["sql"] for q in self.queries)
+        sql_seconds = sum(q["duration_ms"] for q in self.queries) / 1000
+        view = self.view_seconds if self.view_seconds is not None else total
+
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": status_code,
+            "created": time.time(),
+            "total_ms": _ms(total),
+            "view_ms": _ms(view),
+            "sql_ms": _ms(sql_seconds),
+            # Serializer time includes any SQL the serializers triggered.
+            "serializer_ms": _ms(self.serializer_seconds),
+            "view_other_ms": _ms(max(view - sql_seconds - self.serializer_seconds, 0)),
+            "render_ms": _ms(max(total - view, 0)),
+            "query_count": len(self.queries),
+            "duplicate_queries": [
+                {"sql": sql, "count": count} for (sql, _), count in exact.most_common() if count > 1
+            ],
+            "repeated_queries": [
+                {"sql": sql, "count": count} for sql, count in same_sql.most_common() if count > 1
+            ],
+            "queries": self.queries,
+            "cprofile": self._top_functions(),
+        }
+
+    def _top_functions(self):
+        if self.profiler is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(settings.PROFILING_CPROFILE_LINES)
+        return out.getvalue()
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _instrument():
+    """Time BaseSerializer.data, which every top-level serializer goes through."""
+    global _patched
+    with _patch_lock:
+        if _patched:
+            return
+        original = BaseSerializer.data.fget
+
+        def data(self):
+            profile = _active.get()
+            if profile is None or profile.serializer_depth:
+                return original(self)
+            profile.serializer_depth += 1
+            start = time.perf_counter()
+            try:
+                return original(self)
+            finally:
+                profile.serializer_depth -= 1
+                profile.serializer_seconds += time.perf_counter() - start
+
+        BaseSerializer.data = property(data)
+        _patched = True
+
+
+def _is_admin(user):
+    return getattr(user, "role", None) == "admin"
+
+
+def _may_profile(request):
+    user = getattr(request, "user", None)  # Django admin session
+    if user is not None and user.is_authenticated and _is_admin(user):
+        return True
+    try:
+        result = RevocableJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and _is_admin(result[0])
+
+
+def _path(name):
+    return os.path.join(settings.PROFILING_ROOT, name)
+
+
+def _store(report, profiler):
+    os.makedirs(settings.PROFILING_ROOT, exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(_path(f"{report['id']}.prof"))
+    tmp = _path(f".{report['id']}.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    os.replace(tmp, _path(f"{report['id']}.json"))
+
+    # Keep only the newest PROFILING_KEEP reports.
+    for name in _report_names()[settings.PROFILING_KEEP:]:
+        for ext in (".json", ".prof"):
+            try:
+                os.remove(_path(name + ext))
+            except FileNotFoundError:
+                pass
+
+
+def _report_names():
+    """Report ids, newest first."""
+    try:
+        entries = [e for e in os.scandir(settings.PROFILING_ROOT) if e.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return [e.name[:-len(".json")] for e in entries]
+
+
+def recent():
+    """Summaries of the stored reports, newest first."""
+    summaries = []
+    for profile_id in _report_names():
+        report = load(profile_id)
+        if report:
+            summaries.append({
+                key: report[key]
+                for key in ("id", "method", "path", "status", "created", "total_ms", "query_count")
+            })
+    return summaries
+
+
+def load(profile_id):
+    if not ID_RE.fullmatch(profile_id):
+        return None
+    try:
+        with open(_path(f"{profile_id}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pstats_path(profile_id):
+    if not ID_RE.fullmatch(profile_id) or not os.path.exists(_path(f"{profile_id}.prof")):
+        return None
+    return _path(f"{profile_id}.prof")
+
+
+class ProfilingMiddleware:
+    """Keep last in MIDDLEWARE: process_view runs the view itself to time it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(HEADER)
+        if mode is None and PARAM + "=" in request.META.get("QUERY_STRING", ""):
+            mode = request.GET.get(PARAM)
+        if mode is None or mode.lower() not in MODES or not _may_profile(request):
+            return self.get_response(request)
+        return self._profile(request, mode.lower())
+
+    def _profile(self, request, mode):
+        _instrument()
+        profile = Profile(request, mode)
+        token = _active.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.sql_wrapper(connection.alias)))
+                if profile.profiler:
+                    profile.profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profile.profiler:
+                        profile.profiler.disable()
+        finally:
+            _active.reset(token)
+
+        report = profile.report(response.status_code, time.perf_counter() - profile.started)
+        _store(report, profile.profiler)
+        response["X-Profile-Id"] = profile.id
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={report['total_ms']}",
+            f'sql;dur={report["sql_ms"]};desc="{report["query_count"]} queries"',
+            f"serializer;dur={report['serializer_ms']}",
+            f"view;dur={report['view_other_ms']}",
+            f"render;dur={report['render_ms']}",
+        ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _active.get()
+        if profile is None or asyncio.iscoroutinefunction(view_func):
+            return None
+        start = time.perf_counter()
+        response = view_func(request, *view_args, **view_kwargs)
+        profile.view_seconds = time.perf_counter() - start
+        return response
@@ -54,12 +54,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # must be before CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
+    'backend.compression.CompressionMiddleware',  # before anything that reads/changes the body
+    'backend.admission.AdmissionMiddleware',  # early, so a turned-away request costs little
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.profiling.ProfilingMiddleware',  # keep last: it times the view itself
 ]
 
 # ---------------------------------------------------
@@ -85,7 +88,9 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "x-csrftoken",
+    "x-profile",
 ]
+CORS_EXPOSE_HEADERS = ["x-profile-id", "server-timing"]
 
 # ---------------------------------------------------
 # URLS / WSGI
@@ -121,9 +126,135 @@ DATABASES = {
         'PASSWORD': '@Mysql001',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Keep one connection per worker instead of reconnecting per request.
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# ---------------------------------------------------
+# CACHE (serialized post fragments, see backend/fragments.py)
+# ---------------------------------------------------
+# Per-process memory by default; set CACHE_REDIS_URL (pip install redis) to
+# share the fragments between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'brickly',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("CACHE_REDIS_URL"),
+    }
+# Bump when a serializer's output changes so old fragments are never served.
+FRAGMENT_CACHE_VERSION = 1
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# ---------------------------------------------------
+# PRODUCTION SERVER WARM-UP (gunicorn.conf.py / manage.py serve)
+# ---------------------------------------------------
+WARMUP_STEPS = ["urls", "serializers", "indexes", "database"]
+WARMUP_SERIALIZERS = [
+    "realty.serializers.RealtyPostSerializer",
+    "gallery.serializers.GalleryPostSerializer",
+]
+# In-memory indexes (objects with a build() method) built before fork, so
+# workers start with them.
+WARMUP_INDEXES = ["realty.suggest.index"]
+
+# ---------------------------------------------------
+# ADMIN LIVE EVENTS (SSE, /api/admin/events/)
+# ---------------------------------------------------
+EVENT_MODELS = ["contact.ContactMessage", "realty.RealtyPost", "gallery.GalleryPost"]
+# LocalBackend for a single process; RedisBackend (pip install redis) across workers.
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "backend.events.LocalBackend")
+EVENTS_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+EVENTS_REDIS_CHANNEL = "brickly-events"
+EVENTS_KEEPALIVE_SECONDS = 10
+# A stream holds a gunicorn thread (see the "streams" admission class); end
+# it now and then and let the EventSource reconnect.
+EVENTS_STREAM_SECONDS = 60
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HISTORY = 500
+
+# ---------------------------------------------------
+# ADMISSION CONTROL (per route class, across workers; see backend/admission.py)
+# ---------------------------------------------------
+ADMISSION_ROOT = os.getenv("ADMISSION_ROOT", os.path.join(BASE_DIR, 'admission'))  # slot lock files
+# limit: requests running at once; queue: more that may wait up to `wait`
+# seconds; beyond that 503 with Retry-After: `retry_after`. A queued request
+# holds its worker thread while it waits, so queues stay at 0, and the limits
+# are sized from the gunicorn worker count (same default as gunicorn.conf.py)
+# to leave most workers free for everything else. Admin event streams are
+# long-lived, so at most a quarter of all gunicorn threads may hold one.
+ADMISSION_WORKERS = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+ADMISSION_THREADS = int(os.getenv("GUNICORN_THREADS", "4"))
+ADMISSION_CLASSES = {
+    "uploads": {"limit": max(1, ADMISSION_WORKERS // 4), "queue": 0, "retry_after": 10},
+    "bulk": {"limit": 1, "queue": 0, "retry_after": 15},
+    "email": {"limit": max(1, ADMISSION_WORKERS // 4), "queue": 0, "retry_after": 5},
+    "streams": {"limit": max(1, ADMISSION_WORKERS * ADMISSION_THREADS // 4), "queue": 0, "retry_after": 30},
+}
+# (class, methods, URL names); everything else is never held back.
+ADMISSION_RULES = [
+    ("uploads", ["POST", "PUT", "PATCH"], ["realty-list", "realty-detail", "gallery-list", "gallery-detail"]),
+    ("bulk", ["POST"], ["realty-batch"]),
+    ("email", ["POST"], ["contact-message"]),
+    ("streams", ["GET"], ["admin-events"]),
+]
+
+# ---------------------------------------------------
+# REQUEST PROFILING (admins: X-Profile: 1|cprofile or ?_profile=1, see backend/profiling.py)
+# ---------------------------------------------------
+PROFILING_ROOT = os.path.join(BASE_DIR, 'profiles')
+PROFILING_KEEP = 200  # newest reports kept on disk
+PROFILING_CPROFILE_LINES = 40
+
+# ---------------------------------------------------
+# RESPONSE COMPRESSION (gzip, or brotli if installed; see backend/compression.py)
+# ---------------------------------------------------
+COMPRESSION_MIN_SIZE = 860  # bytes; below roughly one packet it isn't worth it
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5  # 11 is many times slower for a few % on JSON
+COMPRESSION_CACHE_BYTES = 32 * 1024 * 1024  # compressed bodies kept per process
+COMPRESSION_TYPES = [
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/rss+xml",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/xml",
+    "text/javascript",
+]
+# Responses holding tokens go out uncompressed (BREACH).
+COMPRESSION_EXCLUDE_URL_NAMES = [
+    "admin-login",
+    "admin-token-refresh",
+    "admin-token-rotate",
+    "admin-logout",
+]
+
+# ---------------------------------------------------
+# SITEMAP & FEED (static files, see backend/sitemaps.py)
+# ---------------------------------------------------
+SITE_URL = os.getenv("SITE_URL", "https://lioncage.ng")
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_CHUNK_SIZE = 10000  # post ids per child sitemap (protocol limit: 50k URLs)
+SITEMAP_POST_URLS = {
+    "realty": "/realty?post={id}",
+    "gallery": "/gallery?post={id}",
+}
+SITEMAP_STATIC_PAGES = ["/", "/services", "/gallery", "/realty", "/about", "/contact"]
+FEED_TITLE = "Lion Cage Construction"
+FEED_SIZE = 50
+
 # ---------------------------------------------------
 # PASSWORD VALIDATION
 # ---------------------------------------------------
@@ -146,6 +277,21 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How /media/ is delivered:
+#   "django"           - FileResponse (sendfile where the server supports it)
+#   "x-accel-redirect" - nginx streams the file from MEDIA_ACCEL_REDIRECT_PREFIX
+#   "x-sendfile"       - Apache mod_xsendfile streams the file
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30  # uploads never change in place
+
+# Uploaded realty/gallery images are re-encoded on save (see backend/images.py)
+IMAGE_MAX_DIMENSION = 2048
+IMAGE_OUTPUT_FORMAT = "JPEG"  # or "WEBP"
+IMAGE_QUALITY = 82
+IMAGE_PLACEHOLDER_SIZE = 16  # longest side of the inline preview, in px
+IMAGE_UPLOAD_WORKERS = 4  # files of one request re-encoded and stored concurrently
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ---------------------------------------------------
@@ -161,10 +307,64 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'adminpanel.authentication.RevocableJWTAuthentication',
     ),
 }
 
+# ---------------------------------------------------
+# GEOCODING (realty "near me" search)
+# ---------------------------------------------------
+# Dotted path to a callable(location) -> (lat, lng) or None. The default only
+# looks names up in REALTY_KNOWN_LOCATIONS, so it works offline and in tests.
+REALTY_GEOCODER = "realty.geo.offline_geocoder"
+REALTY_KNOWN_LOCATIONS = {
+    "abuja": (9.0765, 7.3986),
+    "kaduna": (10.5105, 7.4165),
+    "lagos": (6.5244, 3.3792),
+    "kano": (12.0022, 8.5920),
+    "port harcourt": (4.8156, 7.0498),
+}
+REALTY_NEARBY_MAX_RADIUS_KM = 500
+REALTY_NEARBY_MAX_RESULTS = 100
+
+# Lower bounds of the price bands reported by /api/realty/facets/ (Naira).
+REALTY_PRICE_BANDS = [0, 10_000_000, 50_000_000, 100_000_000, 500_000_000]
+
+# Most listings per create/update/delete list in POST /api/realty/batch/.
+REALTY_BATCH_MAX_ITEMS = 1000
+
+# ---------------------------------------------------
+# SIMILAR LISTINGS (/api/realty/<pk>/similar/, see realty/similar.py)
+# ---------------------------------------------------
+REALTY_SIMILAR_ROOT = os.path.join(BASE_DIR, 'similar_index')
+# Relative weight of each feature group; changing them triggers a rebuild.
+REALTY_SIMILAR_WEIGHTS = {
+    "type": 1.0,
+    "category": 1.0,
+    "location": 1.5,
+    "price": 1.5,
+    "size": 1.0,
+    "bedrooms": 1.0,
+}
+REALTY_SIMILAR_MAX_RESULTS = 20
+
+# ---------------------------------------------------
+# DELTA SYNC (/api/realty/sync/, /api/gallery/sync/, see backend/sync.py)
+# ---------------------------------------------------
+SYNC_PAGE_SIZE = 500  # posts per response; also the largest ?limit=
+# Each final cursor reaches this far back, to catch late-committing writes.
+SYNC_OVERLAP_SECONDS = 30
+# Deleted ids are kept this long; older cursors get 410 and a full resync.
+SYNC_TOMBSTONE_DAYS = 90
+
+# ---------------------------------------------------
+# SEARCH SUGGESTIONS (/api/realty/suggest/?q=, see realty/suggest.py)
+# ---------------------------------------------------
+REALTY_SUGGEST_MAX_TERMS = 50000  # most frequent terms kept in each process
+REALTY_SUGGEST_MAX_RESULTS = 20
+# How often each process checks for listing changes made by other processes.
+REALTY_SUGGEST_CHECK_SECONDS = 30
+
 # ---------------------------------------------------
 # CUSTOM USER MODEL
 # ---------------------------------------------------
@@ -173,12 +373,20 @@ AUTH_USER_MODEL = "adminpanel.Admin"
 # ---------------------------------------------------
 # JWT SETTINGS
 # ---------------------------------------------------
+# Clients renew access tokens at /api/admin/token/refresh/ (or /token/rotate/
+# for a new refresh token too); /api/admin/logout/ revokes both. The admin
+# frontend does not refresh yet and logs out on a 401, so access tokens keep
+# their one-day lifetime until it does; then lower JWT_ACCESS_MINUTES (e.g. 15).
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", "1440"))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': False,
+    # Revoke the old refresh token on rotation (adminpanel.revocation, not
+    # simplejwt's token_blacklist app).
     'BLACKLIST_AFTER_ROTATION': True,
 }
+# How stale each process's in-memory copy of the revoked-token list may get.
+TOKEN_REVOCATION_SYNC_SECONDS = 5
 
 # ---------------------------------------------------
 # EMAIL SETTINGS (Gmail SMTP)
@@ -0,0 +1,224 @@
+# backend/sitemaps.py
+"""sitemap.xml and feed.xml written as static files.
+
+Posts are split into child sitemaps by id range (SITEMAP_CHUNK_SIZE ids per
+file, well under the 50k URL limit), so a change to one post rewrites one
+child file, the small index and the feed instead of the whole set. The
+lastmod of every child is kept in manifest.json next to the files.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import timezone
+from xml.sax.saxutils import escape
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.feedgenerator import Atom1Feed
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock below
+    fcntl = None
+
+SECTIONS = {
+    "realty": "realty.RealtyPost",
+    "gallery": "gallery.GalleryPost",
+}
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+_lock = threading.Lock()
+
+
+def _path(name):
+    return os.path.join(settings.SITEMAP_ROOT, name)
+
+
+def _absolute(path):
+    return settings.SITE_URL.rstrip("/") + path
+
+
+def _post_url(section, pk):
+    return _absolute(settings.SITEMAP_POST_URLS[section].format(id=pk))
+
+
+def _lastmod(value):
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+@contextmanager
+def _locked():
+    """Serialise writers in this process and, where possible, across workers."""
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    with _lock, open(_path(".lock"), "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _write(name, lines):
+    """Write atomically so crawlers never see a half-written file."""
+    tmp = _path(f".{name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(tmp, _path(name))
+
+
+def _load_manifest():
+    try:
+        with open(_path("manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    _write("manifest.json", [json.dumps(manifest, sort_keys=True)])
+
+
+def _write_chunk(section, chunk):
+    """(Re)write one child sitemap; returns (file name, lastmod or None if empty)."""
+    model = apps.get_model(SECTIONS[section])
+    size = settings.SITEMAP_CHUNK_SIZE
+    rows = list(
+        model.objects.filter(pk__gte=chunk * size, pk__lt=(chunk + 1) * size)
+        .order_by("pk")
+        .values_list("pk", "updated_at")
+    )
+    name = f"sitemap-{section}-{chunk}.xml"
+    if not rows:
+        if os.path.exists(_path(name)):
+            os.remove(_path(name))
+        return name, None
+
+    def lines():
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+        for pk, updated_at in rows:
+            yield (
+                f"<url><loc>{escape(_post_url(section, pk))}</loc>"
+                f"<lastmod>{_lastmod(updated_at)}</lastmod></url>\n"
+            )
+        yield "</urlset>\n"
+
+    _write(name, lines())
+    return name, _lastmod(max(updated_at for _, updated_at in rows))
+
+
+def _write_pages():
+    def lines():
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+        for page in settings.SITEMAP_STATIC_PAGES:
+            yield f"<url><loc>{escape(_absolute(page))}</loc></url>\n"
+        yield "</urlset>\n"
+
+    _write("sitemap-pages.xml", lines())
+
+
+def _write_index(manifest):
+    def lines():
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+        yield f"<sitemap><loc>{escape(_absolute('/sitemap-pages.xml'))}</loc></sitemap>\n"
+        for name, lastmod in sorted(manifest.items()):
+            yield (
+                f"<sitemap><loc>{escape(_absolute('/' + name))}</loc>"
+                f"<lastmod>{lastmod}</lastmod></sitemap>\n"
+            )
+        yield "</sitemapindex>\n"
+
+    _write("sitemap.xml", lines())
+
+
+def _write_feed():
+    """Atom feed of the newest realty and gallery posts (two LIMIT queries)."""
+    size = settings.FEED_SIZE
+    items = []
+    for section, label in SECTIONS.items():
+        model = apps.get_model(label)
+        for post in model.objects.order_by("-created_at")[:size]:
+            items.append((section, post))
+    items.sort(key=lambda item: item[1].created_at, reverse=True)
+
+    feed = Atom1Feed(
+        title=settings.FEED_TITLE,
+        link=_absolute("/"),
+        description="Newest realty listings and gallery projects",
+        feed_url=_absolute("/feed.xml"),
+    )
+    for section, post in items[:size]:
+        feed.add_item(
+            title=post.title,
+            link=_post_url(section, post.pk),
+            description=post.description,
+            unique_id=_post_url(section, post.pk),
+            pubdate=post.created_at,
+            updateddate=post.updated_at,
+            categories=[section] + ([post.category] if post.category else []),
+        )
+
+    tmp = _path(".feed.xml.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        feed.write(f, "utf-8")
+    os.replace(tmp, _path("feed.xml"))
+
+
+def _build_all():
+    size = settings.SITEMAP_CHUNK_SIZE
+    for name in os.listdir(settings.SITEMAP_ROOT):
+        if name.startswith("sitemap-") and name.endswith(".xml"):
+            os.remove(_path(name))
+    manifest = {}
+    for section, label in SECTIONS.items():
+        model = apps.get_model(label)
+        pks = model.objects.order_by().values_list("pk", flat=True)
+        for chunk in sorted({pk // size for pk in pks.iterator()}):
+            name, lastmod = _write_chunk(section, chunk)
+            if lastmod:
+                manifest[name] = lastmod
+    _write_pages()
+    _write_index(manifest)
+    _write_feed()
+    _save_manifest(manifest)
+    return manifest
+
+
+def build_all():
+    """Write every file from scratch; returns the number of child sitemaps."""
+    with _locked():
+        return len(_build_all())
+
+
+def update_posts(section, pks):
+    """Rewrite the child sitemaps holding `pks`, the index and the feed."""
+    with _locked():
+        if not os.path.exists(_path("manifest.json")):
+            _build_all()
+            return
+        manifest = _load_manifest()
+        for chunk in sorted({pk // settings.SITEMAP_CHUNK_SIZE for pk in pks}):
+            name, lastmod = _write_chunk(section, chunk)
+            if lastmod:
+                manifest[name] = lastmod
+            else:
+                manifest.pop(name, None)
+        _write_index(manifest)
+        _write_feed()
+        _save_manifest(manifest)
+
+
+def _on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    section = next(s for s, label in SECTIONS.items() if sender._meta.label == label)
+    pk = instance.pk
+    # robust: a sitemap write error is logged, it never fails the save.
+    transaction.on_commit(lambda: update_posts(section, [pk]), robust=True)
+
+
+def connect_signals():
+    for section, label in SECTIONS.items():
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f"sitemap-{section}")
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f"sitemap-{section}")
@@ -0,0 +1,103 @@
+# backend/sync.py
+"""Delta sync for clients that keep a local copy of a post table.
+
+The client sends back the cursor of its previous response and gets the
+posts created or updated since then plus the ids deleted since then
+(tombstones). Without a cursor it gets everything. Tombstones are written
+by the post_delete signal; bulk deletes that skip signals call record().
+Images and bedrooms bump their post's updated_at (backend.fragments), so a
+changed image shows up as a changed post.
+
+Changes are paged in (updated_at, id) order, so a batch that stamped many
+posts with the same time still pages exactly; tombstones come with the
+last page. The last page's cursor starts SYNC_OVERLAP_SECONDS before the
+sync ran, so a transaction that stamped its rows earlier but committed
+later is still picked up, at the cost of resending those few seconds
+(clients upsert by id). Tombstones are kept SYNC_TOMBSTONE_DAYS; a cursor
+older than that gets ExpiredCursor and the client starts over.
+
+Cursors are signed, so clients can't hand back arbitrary values.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ExpiredCursor(InvalidCursor):
+    pass
+
+
+class DeltaSync:
+    """Changes to `model` since a cursor; deleted ids go to `tombstone_model`
+    (fields post_id and deleted_at)."""
+
+    def __init__(self, model, tombstone_model):
+        self.model = model
+        self.tombstone_model = tombstone_model
+        self.salt = f"sync:{model._meta.label_lower}"
+
+    def connect(self):
+        uid = f"sync-{self.model._meta.label_lower}"
+        post_delete.connect(self._post_delete, sender=self.model, dispatch_uid=uid)
+
+    def _post_delete(self, sender, instance, **kwargs):
+        self.record([instance.pk])
+
+    def record(self, ids):
+        """Write tombstones for these deleted posts and drop expired ones."""
+        manager = self.tombstone_model._default_manager
+        manager.bulk_create(self.tombstone_model(post_id=pk) for pk in ids)
+        manager.filter(deleted_at__lt=timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)).delete()
+
+    def _encode(self, updated_at, pk, floor):
+        # (updated_at, pk) of the last post sent; floor: tombstones from.
+        return signing.dumps(
+            {"t": updated_at.isoformat(), "id": pk, "f": floor.isoformat()},
+            salt=self.salt,
+        )
+
+    def _decode(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=self.salt)
+            after = (datetime.fromisoformat(data["t"]), int(data["id"]))
+            floor = datetime.fromisoformat(data["f"])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor("Invalid cursor; sync again without one.")
+        return after, floor
+
+    def changes(self, cursor, limit):
+        """(rows, deleted ids, next cursor, has_more) for the cursor (None for
+        everything). `rows` are (id, updated_at) pairs, oldest change first."""
+        now = timezone.now()
+        resume = now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        if cursor:
+            after, floor = self._decode(cursor)
+            if floor < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+                raise ExpiredCursor("Cursor too old; sync again without one.")
+        else:
+            # Posts deleted while a full sync pages along still get tombstones.
+            after, floor = None, resume
+
+        posts = self.model._default_manager.order_by("updated_at", "pk")
+        if after is not None:
+            posts = posts.filter(Q(updated_at__gt=after[0]) | Q(updated_at=after[0], pk__gt=after[1]))
+        rows = list(posts.values_list("pk", "updated_at")[:limit + 1])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            pk, updated_at = rows[-1]
+            return rows, [], self._encode(updated_at, pk, floor), True
+
+        deleted = sorted(set(
+            self.tombstone_model._default_manager
+            .filter(deleted_at__gte=floor)
+            .values_list("post_id", flat=True)
+        ))
+        return rows, deleted, self._encode(resume, 0, resume), False
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from django.views.static import serve
+
+from .media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,8 +12,9 @@ urlpatterns = [
     path('api/admin/', include('adminpanel.urls')),
     path('api/', include('contact.urls')),
 
+    # Pre-generated sitemap.xml / sitemap-*.xml / feed.xml (nginx can serve SITEMAP_ROOT directly)
+    re_path(r'^(?P<path>sitemap(-[\w-]+)?\.xml|feed\.xml)$', serve, {'document_root': settings.SITEMAP_ROOT}),
 
+    # Uploaded images (Range/ETag aware, can hand off to nginx/Apache)
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$", serve_media, name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
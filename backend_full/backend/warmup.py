@@ -0,0 +1,88 @@
+# backend/warmup.py
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import import_string
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls():
+    """Build the resolver's reverse maps and compile every route regex."""
+    resolver = get_resolver()
+    resolver.reverse_dict
+
+    def walk(patterns):
+        for pattern in patterns:
+            pattern.pattern.regex
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+
+    walk(resolver.url_patterns)
+
+
+def warm_serializers():
+    """Instantiate the heavy serializers so DRF builds their (nested) fields
+    and the model metadata caches behind them."""
+
+    def touch(serializer):
+        for field in serializer.fields.values():
+            child = getattr(field, "child", field)
+            if isinstance(child, BaseSerializer):
+                touch(child)
+
+    for path in settings.WARMUP_SERIALIZERS:
+        touch(import_string(path)())
+
+
+def warm_indexes():
+    """Build the in-memory indexes once here instead of in every worker."""
+    for path in settings.WARMUP_INDEXES:
+        import_string(path).build()
+    connections.close_all()
+
+
+def warm_database():
+    """Import the driver and check connectivity, then close again.
+
+    Connections must not be shared across fork(); each worker opens its own
+    persistent connection in open_connections()."""
+    for alias in connections:
+        connections[alias].ensure_connection()
+    connections.close_all()
+
+
+STEPS = {
+    "urls": warm_urls,
+    "serializers": warm_serializers,
+    "indexes": warm_indexes,
+    "database": warm_database,
+}
+
+
+def warm_up(steps=None):
+    """Run the configured warm-up steps; returns [(step, seconds), ...]."""
+    timings = []
+    for name in steps or settings.WARMUP_STEPS:
+        started = time.perf_counter()
+        STEPS[name]()
+        timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def open_connections():
+    """Called in each worker right after fork."""
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def format_report(timings):
+    width = max(len(name) for name, _ in timings)
+    lines = [f"  {name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in timings]
+    total = sum(seconds for _, seconds in timings)
+    lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+    return "\n".join(lines)
@@ -1,6 +1,9 @@
 import os
+import time
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
+_started = time.perf_counter()
 application = get_wsgi_application()
+load_seconds = time.perf_counter() - _started  # reported by gunicorn.conf.py
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0002_contactmessage_is_read_alter_contactmessage_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['created_at'], name='contact_created_idx'),
+        ),
+    ]
@@ -9,5 +9,12 @@ class ContactMessage(models.Model):
     is_read = models.BooleanField(default=False)  # 👈 Add this line
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Inbox listing filtered by is_read, newest first, and unread count.
+            models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+            models.Index(fields=['created_at'], name='contact_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.subject}"
@@ -5,3 +5,18 @@ class ContactMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = ['id', 'name', 'email', 'phone', 'subject', 'message', 'created_at']
+
+
+class ContactInboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactMessage
+        fields = ['id', 'name', 'email', 'phone', 'subject', 'message', 'is_read', 'created_at']
+
+
+class ContactBulkActionSerializer(serializers.Serializer):
+    ACTION_CHOICES = ['mark_read', 'mark_unread', 'delete']
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
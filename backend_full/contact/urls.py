@@ -1,6 +1,14 @@
 from django.urls import path
-from .views import ContactMessageCreateView
+from .views import (
+    ContactMessageCreateView,
+    ContactInboxView,
+    ContactUnreadCountView,
+    ContactBulkActionView,
+)
 
 urlpatterns = [
     path('contact/', ContactMessageCreateView.as_view(), name='contact-message'),
+    path('contact/messages/', ContactInboxView.as_view(), name='contact-inbox'),
+    path('contact/messages/unread-count/', ContactUnreadCountView.as_view(), name='contact-unread-count'),
+    path('contact/messages/bulk/', ContactBulkActionView.as_view(), name='contact-bulk-action'),
 ]
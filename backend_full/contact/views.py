@@ -1,10 +1,19 @@
 from rest_framework import generics, status
+from rest_framework.pagination import CursorPagination
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.core.mail import send_mail
 from .models import ContactMessage
-from .serializers import ContactMessageSerializer
+from .serializers import (
+    ContactMessageSerializer,
+    ContactInboxSerializer,
+    ContactBulkActionSerializer,
+)
 from django.conf import settings
 
+from adminpanel.views import IsAdminUserRole
+from backend import events
+
 
 class ContactMessageCreateView(generics.CreateAPIView):
     queryset = ContactMessage.objects.all()
@@ -52,3 +61,56 @@ class ContactMessageCreateView(generics.CreateAPIView):
             recipient_list=[message.email],
             fail_silently=False,
         )
+
+
+class InboxPagination(CursorPagination):
+    # Keyset pagination: no COUNT(*) and no OFFSET scans on deep pages.
+    ordering = ('-created_at', '-id')
+    page_size = 25
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+# ✅ ADMIN INBOX
+class ContactInboxView(generics.ListAPIView):
+    """GET /api/contact/messages/?is_read=&cursor=&limit= — Messages, newest first"""
+    serializer_class = ContactInboxSerializer
+    permission_classes = [IsAdminUserRole]
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        queryset = ContactMessage.objects.all()
+        is_read = self.request.query_params.get('is_read')
+        if is_read is not None:
+            queryset = queryset.filter(is_read=is_read.lower() in ('1', 'true', 'yes'))
+        return queryset
+
+
+class ContactUnreadCountView(APIView):
+    """GET /api/contact/messages/unread-count/ — Number of unread messages"""
+    permission_classes = [IsAdminUserRole]
+
+    def get(self, request):
+        unread = ContactMessage.objects.filter(is_read=False).count()
+        return Response({"unread": unread}, status=status.HTTP_200_OK)
+
+
+class ContactBulkActionView(APIView):
+    """POST /api/contact/messages/bulk/ — Mark read/unread or delete many messages at once"""
+    permission_classes = [IsAdminUserRole]
+
+    def post(self, request):
+        serializer = ContactBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        action = serializer.validated_data['action']
+
+        messages = ContactMessage.objects.filter(id__in=ids)
+        if action == 'delete':
+            # post_delete publishes a 'deleted' event for each message.
+            count, _ = messages.delete()
+        else:
+            count = messages.update(is_read=(action == 'mark_read'))
+            events.publish(ContactMessage, 'updated', ids)
+
+        return Response({"action": action, "count": count}, status=status.HTTP_200_OK)
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 class GalleryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gallery'
+
+    def ready(self):
+        from backend.fragments import connect_children
+        from .facets import counter
+        from .models import GalleryImage
+        from .sync import sync
+        counter.connect()
+        sync.connect()
+        connect_children(GalleryImage)
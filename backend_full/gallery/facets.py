@@ -0,0 +1,11 @@
+# gallery/facets.py
+from backend.facets import FacetCounter, same
+from .models import GalleryFacetCount, GalleryPost
+
+counter = FacetCounter(
+    GalleryPost,
+    GalleryFacetCount,
+    {
+        "category": ("category", same),
+    },
+)
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:26
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counts(apps, schema_editor):
+    GalleryPost = apps.get_model('gallery', 'GalleryPost')
+    GalleryFacetCount = apps.get_model('gallery', 'GalleryFacetCount')
+
+    rows = (
+        GalleryPost.objects.exclude(category='')
+        .order_by()
+        .values('category')
+        .annotate(n=Count('pk'))
+        .values_list('category', 'n')
+    )
+    GalleryFacetCount.objects.all().delete()
+    GalleryFacetCount.objects.bulk_create(
+        GalleryFacetCount(facet='category', value=category, count=n)
+        for category, n in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GalleryFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='unique_gallery_facet_value')],
+            },
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='galleryimage',
+            name='aspect_ratio',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    GalleryPost = apps.get_model('gallery', 'GalleryPost')
+    GalleryPost.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0004_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallerypost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from backend.images import optimize_image
+
 class GalleryPost(models.Model):
     CATEGORY_CHOICES = [
         ('residential', 'Residential'),
@@ -11,6 +13,12 @@ class GalleryPost(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='gallery_post_sync_idx'),  # delta sync paging
+        ]
 
     def __str__(self):
         return self.title
@@ -19,6 +27,42 @@ class GalleryPost(models.Model):
 class GalleryImage(models.Model):
     post = models.ForeignKey(GalleryPost, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='gallery_images/')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)  # tiny data: URI preview
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False)
+    aspect_ratio = models.FloatField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f'Image for {self.post.title}'
+
+    def save(self, *args, **kwargs):
+        # Only new uploads; URLs stored as plain strings are left alone.
+        if self.image and not self.image._committed:
+            optimize_image(self)
+        super().save(*args, **kwargs)
+
+
+class GalleryFacetCount(models.Model):
+    """Gallery post counts per facet value, maintained by gallery.facets."""
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_gallery_facet_value'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class GalleryTombstone(models.Model):
+    """Id of a deleted gallery post, kept for delta sync clients (gallery.sync)."""
+    post_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Gallery post {self.post_id} deleted {self.deleted_at}"
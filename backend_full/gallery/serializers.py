@@ -1,4 +1,6 @@
+from django.db import transaction
 from rest_framework import serializers
+from backend.images import create_images
 from .models import GalleryPost, GalleryImage
 
 
@@ -7,7 +9,13 @@ class GalleryImageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GalleryImage
-        fields = ['id', 'image', 'image_url']
+        fields = [
+            'id', 'image', 'image_url', 'width', 'height', 'bytes',
+            'placeholder', 'dominant_color', 'aspect_ratio',
+        ]
+        read_only_fields = [
+            'width', 'height', 'bytes', 'placeholder', 'dominant_color', 'aspect_ratio',
+        ]
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -25,16 +33,18 @@ class GalleryPostSerializer(serializers.ModelSerializer):
         model = GalleryPost
         fields = ['id', 'title', 'category', 'description', 'created_at', 'images']
 
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get('request')
         images = request.FILES.getlist('images')
         post = GalleryPost.objects.create(**validated_data)
 
-        for image in images:
-            GalleryImage.objects.create(post=post, image=image)
+        # ✅ Files are stored in parallel, then inserted in one query
+        create_images(GalleryImage, post, images)
 
         return post
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         request = self.context.get('request')
         images = request.FILES.getlist('images')
@@ -47,7 +57,6 @@ class GalleryPostSerializer(serializers.ModelSerializer):
         # ✅ Only replace images if new ones are provided
         if images:
             instance.images.all().delete()
-            for image in images:
-                GalleryImage.objects.create(post=instance, image=image)
+            create_images(GalleryImage, instance, images)
 
         return instance
@@ -0,0 +1,5 @@
+# gallery/sync.py
+from backend.sync import DeltaSync
+from .models import GalleryPost, GalleryTombstone
+
+sync = DeltaSync(GalleryPost, GalleryTombstone)
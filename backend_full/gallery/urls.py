@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import GalleryPostListView, GalleryPostDetailView
+from .views import GalleryPostListView, GalleryPostDetailView, GalleryFacetsView, GallerySyncView
 
 urlpatterns = [
     path('', GalleryPostListView.as_view(), name='gallery-list'),
+    path('facets/', GalleryFacetsView.as_view(), name='gallery-facets'),
+    path('sync/', GallerySyncView.as_view(), name='gallery-sync'),
     path('<int:pk>/', GalleryPostDetailView.as_view(), name='gallery-detail'),
 ]
@@ -1,8 +1,22 @@
+from django.conf import settings
+from django.http import Http404
 from rest_framework import generics, status
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from .facets import counter as facet_counter
 from .models import GalleryPost
 from .serializers import GalleryPostSerializer
+from .sync import sync as post_sync
+from backend.fragments import FragmentCache
+from backend.sync import ExpiredCursor, InvalidCursor
+
+post_fragments = FragmentCache(
+    "gallery-post",
+    GalleryPost.objects.prefetch_related('images'),
+    GalleryPostSerializer,
+)
 
 
 class GalleryPostListView(generics.ListCreateAPIView):
@@ -13,6 +27,9 @@ class GalleryPostListView(generics.ListCreateAPIView):
     def get_serializer_context(self):
         return {'request': self.request}
 
+    def list(self, request, *args, **kwargs):
+        return Response(post_fragments.render_queryset(self.get_queryset(), request))
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -30,6 +47,12 @@ class GalleryPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_serializer_context(self):
         return {'request': self.request}
 
+    def retrieve(self, request, *args, **kwargs):
+        data = post_fragments.render_queryset(self.get_queryset().filter(pk=kwargs['pk']), request)
+        if not data:
+            raise Http404
+        return Response(data[0])
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
@@ -46,3 +69,38 @@ class GalleryPostDetailView(generics.RetrieveUpdateDestroyAPIView):
             {"detail": "Gallery post updated successfully!", "data": response_serializer.data},
             status=status.HTTP_200_OK
         )
+
+
+class GalleryFacetsView(APIView):
+    """GET /api/gallery/facets/ — Gallery post counts per category"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(facet_counter.counts(), status=status.HTTP_200_OK)
+
+
+class GallerySyncView(APIView):
+    """GET /api/gallery/sync/?since=<cursor>&limit= — Gallery posts changed or deleted since the cursor"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", settings.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.SYNC_PAGE_SIZE))
+
+        try:
+            rows, deleted, cursor, has_more = post_sync.changes(request.query_params.get("since"), limit)
+        except ExpiredCursor as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_410_GONE)
+        except InvalidCursor as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ✅ Same cached fragments as the list; keep requesting while has_more
+        return Response({
+            "changed": post_fragments.render(rows, request),
+            "deleted": deleted,
+            "cursor": cursor,
+            "has_more": has_more,
+        }, status=status.HTTP_200_OK)
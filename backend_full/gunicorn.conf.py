@@ -0,0 +1,36 @@
+# gunicorn.conf.py — production server, started with `python manage.py serve`
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Threads per worker: a long-lived request such as the admin event stream
+# ties up one thread rather than a whole process.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Import Django, the URLconf and the apps once in the master; workers are
+# forked with all of it already in memory.
+preload_app = True
+wsgi_app = "backend.wsgi:application"
+
+# Recycle workers so slow leaks never build up; jitter keeps them from all
+# restarting at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker forks.
+    from backend import wsgi
+    from backend.warmup import format_report, warm_up
+
+    timings = [("load application", wsgi.load_seconds)] + warm_up()
+    server.log.info("Startup time:\n%s", format_report(timings))
+
+
+def post_fork(server, worker):
+    from backend.warmup import open_connections
+
+    open_connections()
@@ -3,3 +3,15 @@ from django.apps import AppConfig
 class RealtyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'realty'
+
+    def ready(self):
+        from backend.fragments import connect_children
+        from .facets import counter
+        from .models import RealtyImage, Bedroom
+        from . import similar, suggest
+        from .sync import sync
+        counter.connect()
+        connect_children(RealtyImage, Bedroom)
+        similar.connect_signals()
+        suggest.connect_signals()
+        sync.connect()
@@ -0,0 +1,151 @@
+# realty/batch.py
+"""Many listings in one transaction (POST /api/realty/batch/).
+
+Posts go through bulk_create/bulk_update and their bedrooms and images are
+written with one INSERT per table, so save() and the model signals don't run
+per row. The facet counters, delete tombstones, live events, sitemaps, the
+similar-listings matrix and the suggest index are brought up to date here,
+once per batch.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from backend import events, sitemaps
+from . import similar
+from .suggest import index as suggest_index
+from .sync import sync as post_sync
+from .facets import counter as facet_counter
+from .models import Bedroom, RealtyImage, RealtyPost
+
+NESTED = ("bedrooms", "images")
+
+
+def _facet_values(posts):
+    return [{field: getattr(post, field) for field in facet_counter.source_fields} for post in posts]
+
+
+def _children(post, data):
+    bedrooms = [Bedroom(post=post, **bedroom) for bedroom in data.get("bedrooms", [])]
+    images = [RealtyImage(post=post, image=url) for url in data.get("images", [])]
+    return bedrooms, images
+
+
+def _delete_where(model, field, ids):
+    """DELETE FROM <model> WHERE <field> IN ids, without signals.
+
+    .delete() would SELECT every row first and run each post_delete handler
+    per row; the side effects of deleting posts are applied in bulk below
+    instead (facet counters, tombstones, events, sitemaps, similar, suggest).
+    """
+    if not ids:
+        return 0
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column = quote(model._meta.get_field(field).column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", list(ids))
+        return cursor.rowcount
+
+
+def _delete(ids):
+    rows = list(RealtyPost.objects.filter(pk__in=ids).values("pk", *facet_counter.source_fields))
+    found = [row["pk"] for row in rows]
+    if found:
+        # No ON DELETE CASCADE in the schema, so children go first.
+        _delete_where(Bedroom, "post", found)
+        _delete_where(RealtyImage, "post", found)
+        _delete_where(RealtyPost, "id", found)
+        facet_counter.adjust(removed=rows)
+        post_sync.record(found)  # delete tombstones, normally from post_delete
+    return found
+
+
+def _update(pairs):
+    now = timezone.now()
+    posts = [post for post, _ in pairs]
+    removed = _facet_values(posts)
+    fields = {"updated_at", "latitude", "longitude", "geohash"}
+    replaced = {name: [] for name in NESTED}
+    bedrooms, images = [], []
+
+    for post, data in pairs:
+        for name, value in data.items():
+            if name != "id" and name not in NESTED:
+                setattr(post, name, value)
+                fields.add(name)
+        post.fill_geolocation()
+        post.updated_at = now  # also gives the post a new cache fragment
+        for name in NESTED:
+            if name in data:
+                replaced[name].append(post.pk)
+        new_bedrooms, new_images = _children(post, data)
+        bedrooms += new_bedrooms
+        images += new_images
+
+    RealtyPost.objects.bulk_update(posts, sorted(fields), batch_size=500)
+    # Nested lists that were sent replace the old ones, as in a single update.
+    _delete_where(Bedroom, "post", replaced["bedrooms"])
+    _delete_where(RealtyImage, "post", replaced["images"])
+    Bedroom.objects.bulk_create(bedrooms)
+    RealtyImage.objects.bulk_create(images)
+    facet_counter.adjust(removed=removed, added=_facet_values(posts))
+    return posts
+
+
+def _create(items):
+    now = timezone.now()
+    posts = []
+    for data in items:
+        post = RealtyPost(**{name: value for name, value in data.items() if name != "id" and name not in NESTED})
+        post.fill_geolocation()
+        post.created_at = post.updated_at = now
+        posts.append(post)
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        RealtyPost.objects.bulk_create(posts)
+    else:
+        # MySQL doesn't report the ids of a multi-row INSERT and the children
+        # need them: one INSERT per post, still inside the one transaction.
+        # raw=True keeps the per-row signal handlers out of it.
+        for post in posts:
+            post.save_base(raw=True)
+
+    bedrooms, images = [], []
+    for post, data in zip(posts, items):
+        new_bedrooms, new_images = _children(post, data)
+        bedrooms += new_bedrooms
+        images += new_images
+    Bedroom.objects.bulk_create(bedrooms)
+    RealtyImage.objects.bulk_create(images)
+    facet_counter.adjust(added=_facet_values(posts))
+    return posts
+
+
+@transaction.atomic
+def apply(create=(), update=(), delete=()):
+    """Write a validated batch.
+
+    `create` is a list of validated item dicts, `update` a list of
+    (post, validated partial dict) and `delete` a list of ids. Returns
+    (created posts, updated posts, ids actually deleted).
+    """
+    deleted = _delete(delete) if delete else []
+    updated = _update(update) if update else []
+    created = _create(create) if create else []
+
+    for action, ids in (
+        ("created", [post.pk for post in created]),
+        ("updated", [post.pk for post in updated]),
+        ("deleted", deleted),
+    ):
+        if ids:
+            events.publish(RealtyPost, action, ids)
+
+    changed = [post.pk for post in created + updated] + deleted
+    if changed:
+        # robust: a file write error is logged, it never fails the batch.
+        transaction.on_commit(lambda: sitemaps.update_posts("realty", changed), robust=True)
+        transaction.on_commit(lambda: similar.update_posts(changed), robust=True)
+        transaction.on_commit(suggest_index.invalidate, robust=True)
+    return created, updated, deleted
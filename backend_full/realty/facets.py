@@ -0,0 +1,43 @@
+# realty/facets.py
+import re
+
+from django.conf import settings
+
+from backend.facets import FacetCounter, same
+from .models import RealtyFacetCount, RealtyPost
+
+
+def normalize_location(location):
+    return " ".join((location or "").lower().split()) or None
+
+
+def parse_price(price):
+    """Prices are free text ("600000000", "₦95,200,000"); keep the number."""
+    digits = re.sub(r"[^\d.]", "", price or "")
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def price_band(price):
+    amount = parse_price(price)
+    if amount is None:
+        return "unknown"
+    bounds = settings.REALTY_PRICE_BANDS
+    for lower, upper in zip(bounds, bounds[1:]):
+        if lower <= amount < upper:
+            return f"{lower}-{upper}"
+    return f"{bounds[-1]}+"
+
+
+counter = FacetCounter(
+    RealtyPost,
+    RealtyFacetCount,
+    {
+        "type": ("type", same),
+        "category": ("category", same),
+        "location": ("location", normalize_location),
+        "price_band": ("price", price_band),
+    },
+)
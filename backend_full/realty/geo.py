@@ -0,0 +1,106 @@
+# realty/geo.py
+import math
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~5m cells, plenty for a listing
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch = (ch << 1) | 1
+                lng_lo = mid
+            else:
+                ch <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def cell_size_deg(precision):
+    """(lat, lng) size in degrees of a geohash cell."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_prefixes(lat, lng, radius_km):
+    """Geohash prefixes whose cells together cover the circle.
+
+    Picks the finest precision whose cells are still at least `radius_km`
+    across, then returns the centre cell and its eight neighbours. Returns
+    an empty list when the circle is too big for prefix pruning to help.
+    """
+    # Cells get narrower towards the poles; size them for the worst latitude.
+    worst_lat = min(abs(lat) + radius_km / 111.0, 89.9)
+    cos_lat = math.cos(math.radians(worst_lat))
+
+    precision = 0
+    for p in range(1, GEOHASH_PRECISION + 1):
+        lat_deg, lng_deg = cell_size_deg(p)
+        if min(lat_deg * 110.574, lng_deg * 111.320 * cos_lat) < radius_km:
+            break
+        precision = p
+    if precision == 0:
+        return []
+
+    lat_deg, lng_deg = cell_size_deg(precision)
+    prefixes = set()
+    for dlat in (-lat_deg, 0, lat_deg):
+        for dlng in (-lng_deg, 0, lng_deg):
+            cell_lat = max(-90.0, min(90.0, lat + dlat))
+            cell_lng = (lng + dlng + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(cell_lat, cell_lng, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Great-circle distance from one point to arrays of points."""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def offline_geocoder(location):
+    """Look the location up in settings.REALTY_KNOWN_LOCATIONS (no network)."""
+    key = " ".join(location.lower().split())
+    return settings.REALTY_KNOWN_LOCATIONS.get(key)
+
+
+def geocode(location):
+    """Return (lat, lng) for a free-text location, or None.
+
+    The backend is settings.REALTY_GEOCODER so a real service can be plugged
+    in without touching the model.
+    """
+    if not location:
+        return None
+    geocoder = import_string(settings.REALTY_GEOCODER)
+    return geocoder(location)
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from realty import similar
+
+
+class Command(BaseCommand):
+    help = "Rebuild the feature matrix behind /api/realty/<pk>/similar/ (kept up to date on save)."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = similar.build()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} listings in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from realty.models import RealtyPost
+
+
+class Command(BaseCommand):
+    help = "Fill latitude/longitude/geohash for listings that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = RealtyPost.objects.filter(geohash="").exclude(location="").order_by("pk")
+        located = missing = 0
+        for post in pending.iterator(chunk_size=options["chunk_size"]):
+            # save() geocodes and computes the geohash; leave updated_at alone.
+            post.save(update_fields=["latitude", "longitude", "geohash"])
+            if post.geohash:
+                located += 1
+            else:
+                missing += 1
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {located} listings, {missing} could not be located."))
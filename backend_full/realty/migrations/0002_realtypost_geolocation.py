@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='realtypost',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='realtypost',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='realtypost',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:26
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# The counting rules as they stood when this migration was written, so it
+# does not change with realty/facets.py.
+PRICE_BANDS = [0, 10_000_000, 50_000_000, 100_000_000, 500_000_000]
+
+
+def price_band(price, PRICE_BANDS):
+    digits = re.sub(r'[^\d.]', '', price or '')
+    try:
+        amount = float(digits)
+    except ValueError:
+        return 'unknown'
+    for lower, upper in zip(bounds, bounds[1:]):
+        if lower <= amount < upper:
+            return f'{lower}-{upper}'
+    return f'{bounds[-1]}+'
+
+
+def populate_counts(apps, schema_editor):
+    RealtyPost = apps.get_model('realty', 'RealtyPost')
+    RealtyFacetCount = apps.get_model('realty', 'RealtyFacetCount')
+
+    counts = Counter()
+    rows = RealtyPost.objects.values_list('type', 'category', 'location', 'price')
+    for type_, category, location, price in rows.iterator():
+        if type_:
+            counts[('type', type_)] += 1
+        if category:
+            counts[('category', category)] += 1
+        location = ' '.join((location or '').lower().split())
+        if location:
+            counts[('location', location)] += 1
+        counts[('price_band', price_band(price, PRICE_BANDS))] += 1
+
+    RealtyFacetCount.objects.all().delete()
+    RealtyFacetCount.objects.bulk_create(
+        RealtyFacetCount(facet=facet, value=value, count=count)
+        for (facet, value), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0002_realtypost_geolocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RealtyFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='unique_realty_facet_value')],
+            },
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0005_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RealtyTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='realtypost',
+            index=models.Index(fields=['updated_at', 'id'], name='realty_post_sync_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 
+from backend.images import optimize_image
+from .geo import encode_geohash, geocode
+
 class RealtyPost(models.Model):
     PROPERTY_TYPE_CHOICES = [
         ('sale', 'For Sale'),
@@ -14,21 +17,81 @@ class RealtyPost(models.Model):
     description = models.TextField(blank=True)
     living_room_sqm = models.FloatField(null=True, blank=True)
     kitchen_sqm = models.FloatField(null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='realty_post_sync_idx'),  # delta sync paging
+        ]
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # What was geocoded, so fill_geolocation() can tell a moved listing.
+        geo_fields = ('location', 'latitude', 'longitude')
+        if all(name in field_names for name in geo_fields):  # not deferred
+            post._loaded_geo = tuple(getattr(post, name) for name in geo_fields)
+        return post
+
+    def _location_moved(self):
+        """True when `location` was edited but the coordinates weren't."""
+        loaded = getattr(self, '_loaded_geo', None)
+        if loaded is None:
+            return False
+        location, latitude, longitude = loaded
+        return (
+            self.location != location
+            and self.latitude == latitude
+            and self.longitude == longitude
+        )
+
+    def fill_geolocation(self):
+        """Geocode missing or stale coordinates and derive the geohash (bulk
+        writes skip save(), so they call this themselves)."""
+        if self._location_moved():
+            self.latitude = self.longitude = None
+        if self.latitude is None or self.longitude is None:
+            coords = geocode(self.location)
+            if coords:
+                self.latitude, self.longitude = coords
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+
+    def save(self, *args, **kwargs):
+        self.fill_geolocation()
+        super().save(*args, **kwargs)
+        self._loaded_geo = (self.location, self.latitude, self.longitude)
+
 
 class RealtyImage(models.Model):
     post = models.ForeignKey(RealtyPost, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='realty_images/')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)  # tiny data: URI preview
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False)
+    aspect_ratio = models.FloatField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f'Image for {self.post.title}'
 
+    def save(self, *args, **kwargs):
+        # Only new uploads; URLs stored as plain strings are left alone.
+        if self.image and not self.image._committed:
+            optimize_image(self)
+        super().save(*args, **kwargs)
+
 
 class Bedroom(models.Model):
     post = models.ForeignKey(RealtyPost, related_name='bedrooms', on_delete=models.CASCADE)
@@ -37,3 +100,27 @@ class Bedroom(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.post.title}"
+
+
+class RealtyFacetCount(models.Model):
+    """Listing counts per facet value, maintained by realty.facets."""
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_realty_facet_value'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class RealtyTombstone(models.Model):
+    """Id of a deleted listing, kept for delta sync clients (realty.sync)."""
+    post_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Listing {self.post_id} deleted {self.deleted_at}"
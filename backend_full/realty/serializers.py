@@ -1,5 +1,8 @@
 # realty/serializers.py
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
+from backend.images import create_images
 from .models import RealtyPost, RealtyImage, Bedroom
 import json
 
@@ -8,7 +11,13 @@ class RealtyImageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = RealtyImage
-        fields = ['id', 'image', 'image_url']
+        fields = [
+            'id', 'image', 'image_url', 'width', 'height', 'bytes',
+            'placeholder', 'dominant_color', 'aspect_ratio',
+        ]
+        read_only_fields = [
+            'width', 'height', 'bytes', 'placeholder', 'dominant_color', 'aspect_ratio',
+        ]
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -36,7 +45,7 @@ class RealtyPostSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'type', 'category', 'price', 'location',
             'description', 'living_room_sqm', 'kitchen_sqm',
-            'images', 'bedrooms', 'created_at', 
+            'latitude', 'longitude', 'images', 'bedrooms', 'created_at', 
         ]
 
     def _parse_json_field(self, field_name):
@@ -48,30 +57,35 @@ class RealtyPostSerializer(serializers.ModelSerializer):
                 return []
         return self.validated_data.pop(field_name, [])
 
-    def create(self, validated_data):
-        bedrooms_data = self._parse_json_field('bedrooms')
-        images_data = self._parse_json_field('images')
-        post = RealtyPost.objects.create(**validated_data)
-
-        # ✅ Handle multiple uploaded images
+    def _images(self, images_data):
+        """Uploaded files first, then image URLs (in case sent as JSON)."""
+        images = []
         request = self.context.get('request')
         if request and hasattr(request, 'FILES'):
-            file_list = request.FILES.getlist('images')
-            for file in file_list:
-                RealtyImage.objects.create(post=post, image=file)
-
-        # ✅ Handle image URLs (in case sent as JSON)
+            images += request.FILES.getlist('images')
         for image_data in images_data:
             image_value = image_data.get('image')
             if image_value and isinstance(image_value, str):
-                RealtyImage.objects.create(post=post, image=image_value)
+                images.append(image_value)
+        return images
+
+    @transaction.atomic
+    def create(self, validated_data):
+        bedrooms_data = self._parse_json_field('bedrooms')
+        images_data = self._parse_json_field('images')
+        post = RealtyPost.objects.create(**validated_data)
 
         # ✅ Handle bedrooms
         for bedroom_data in bedrooms_data:
             Bedroom.objects.create(post=post, **bedroom_data)
 
+        # ✅ Handle multiple uploaded images (stored in parallel, last so a
+        # failure leaves no files behind)
+        create_images(RealtyImage, post, self._images(images_data))
+
         return post
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         bedrooms_data = self._parse_json_field('bedrooms')
         images_data = self._parse_json_field('images')
@@ -84,18 +98,40 @@ class RealtyPostSerializer(serializers.ModelSerializer):
         instance.bedrooms.all().delete()
         instance.images.all().delete()
 
-        request = self.context.get('request')
-        if request and hasattr(request, 'FILES'):
-            file_list = request.FILES.getlist('images')
-            for file in file_list:
-                RealtyImage.objects.create(post=instance, image=file)
-
-        for image_data in images_data:
-            image_value = image_data.get('image')
-            if image_value and isinstance(image_value, str):
-                RealtyImage.objects.create(post=instance, image=image_value)
-
         for bedroom_data in bedrooms_data:
             Bedroom.objects.create(post=instance, **bedroom_data)
 
+        create_images(RealtyImage, instance, self._images(images_data))
+
         return instance
+
+
+class RealtyBatchItemSerializer(serializers.ModelSerializer):
+    """One listing in POST /api/realty/batch/: bedrooms inline, images as URLs."""
+    id = serializers.IntegerField(required=False)
+    bedrooms = BedroomSerializer(many=True, required=False)
+    images = serializers.ListField(
+        child=serializers.CharField(max_length=RealtyImage._meta.get_field('image').max_length),
+        required=False,
+    )
+
+    class Meta:
+        model = RealtyPost
+        fields = [
+            'id', 'title', 'type', 'category', 'price', 'location',
+            'description', 'living_room_sqm', 'kitchen_sqm',
+            'latitude', 'longitude', 'images', 'bedrooms',
+        ]
+
+
+class RealtyBatchSerializer(serializers.Serializer):
+    create = serializers.ListField(
+        child=serializers.DictField(), required=False, max_length=settings.REALTY_BATCH_MAX_ITEMS
+    )
+    update = serializers.ListField(
+        child=serializers.DictField(), required=False, max_length=settings.REALTY_BATCH_MAX_ITEMS
+    )
+    delete = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False,
+        max_length=settings.REALTY_BATCH_MAX_ITEMS,
+    )
@@ -0,0 +1,286 @@
+# realty/similar.py
+""""You may also like" listings from a precomputed feature matrix.
+
+Every listing is one L2-normalised float32 row: type (one-hot), standardised
+log price / living room / kitchen / bedroom count / bedroom area, and hashed
+category and location tokens. Cosine similarity against every listing is
+then a single matrix-vector product.
+
+The matrix is kept in REALTY_SIMILAR_ROOT as .npy files which every worker
+maps read-only, so all processes share one copy through the page cache and
+see in-place writes at once. A changed listing rewrites its own row; a new
+one takes a spare row. The files are only rewritten when the spare rows run
+out (or the weights change), by a full rebuild.
+
+A rebuild writes ids, matrix and meta into a new generation directory and
+publishes it by replacing the one-line `current` file, so a reader always
+maps an ids/matrix pair from the same build.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import uuid
+import warnings
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, post_save
+
+from .facets import normalize_location, parse_price
+from .models import Bedroom, RealtyPost
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock below
+    fcntl = None
+
+FORMAT = 1
+TYPES = [value for value, _ in RealtyPost.PROPERTY_TYPE_CHOICES]
+NUMERIC = ["price", "living_room_sqm", "kitchen_sqm", "bedroom_count", "bedroom_sqm"]
+NUMERIC_GROUPS = ["price", "size", "size", "bedrooms", "bedrooms"]
+HASH_DIM = 64
+DIM = len(TYPES) + len(NUMERIC) + HASH_DIM
+FREE = -1  # id of an unused row
+
+_lock = threading.Lock()
+_mapped = {}  # generation -> (ids, matrix) maps of this process
+
+
+def _path(*names):
+    return os.path.join(settings.REALTY_SIMILAR_ROOT, *names)
+
+
+def _generation():
+    """The published build's directory name, or None before the first build."""
+    try:
+        with open(_path("current"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _locked():
+    """Serialise writers in this process and, where possible, across workers."""
+    os.makedirs(settings.REALTY_SIMILAR_ROOT, exist_ok=True)
+    with _lock, open(_path(".lock"), "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _rows(queryset):
+    return queryset.annotate(
+        bedroom_count=Count("bedrooms"), bedroom_sqm=Sum("bedrooms__sqm"),
+    ).values_list(
+        "pk", "type", "category", "location",
+        "price", "living_room_sqm", "kitchen_sqm", "bedroom_count", "bedroom_sqm",
+    )
+
+
+def _numeric(row):
+    """log1p of the numeric features; NaN where unknown."""
+    values = [parse_price(row[4]), *row[5:9]]
+    return [math.log1p(v) if v is not None and v >= 0 else math.nan for v in values]
+
+
+def _bucket(token):
+    # crc32, not hash(): it must be the same in every process.
+    return len(TYPES) + len(NUMERIC) + zlib.crc32(token.encode()) % HASH_DIM
+
+
+def _vector(row, numeric, meta):
+    weights = meta["weights"]
+    vector = np.zeros(DIM, dtype=np.float32)
+    _, type_, category, location = row[:4]
+
+    if type_ in TYPES:
+        vector[TYPES.index(type_)] = weights["type"]
+
+    scaled = (np.array(numeric) - meta["mean"]) / meta["std"]
+    scaled = np.nan_to_num(scaled)  # unknown counts as average
+    scaled *= [weights[group] for group in NUMERIC_GROUPS]
+    vector[len(TYPES):len(TYPES) + len(NUMERIC)] = scaled
+
+    category = " ".join((category or "").lower().split())
+    if category:
+        vector[_bucket("category:" + category)] += weights["category"]
+    words = [w for w in re.split(r"[^\w]+", normalize_location(location) or "") if w]
+    for word in words:
+        vector[_bucket("location:" + word)] += weights["location"] / math.sqrt(len(words))
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _load_meta(generation):
+    try:
+        with open(_path(generation, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != FORMAT or meta.get("weights") != settings.REALTY_SIMILAR_WEIGHTS:
+        return None
+    return meta
+
+
+def _build():
+    rows = list(_rows(RealtyPost.objects.order_by("pk")).iterator(chunk_size=2000))
+    numeric = np.array([_numeric(row) for row in rows], dtype=float).reshape(-1, len(NUMERIC))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        mean = np.nan_to_num(np.nanmean(numeric, axis=0))
+        std = np.nanstd(numeric, axis=0)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    meta = {
+        "format": FORMAT,
+        "weights": settings.REALTY_SIMILAR_WEIGHTS,
+        "mean": mean.tolist(),
+        "std": std.tolist(),
+    }
+
+    # Spare rows so new listings don't force a rewrite.
+    capacity = max(64, int(len(rows) * 1.25))
+    ids = np.full(capacity, FREE, dtype=np.int64)
+    matrix = np.zeros((capacity, DIM), dtype=np.float32)
+    for i, row in enumerate(rows):
+        ids[i] = row[0]
+        matrix[i] = _vector(row, numeric[i], meta)
+
+    generation = f"gen-{uuid.uuid4().hex[:12]}"
+    os.makedirs(_path(generation))
+    np.save(_path(generation, "ids.npy"), ids)
+    np.save(_path(generation, "matrix.npy"), matrix)
+    with open(_path(generation, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    _publish(generation)
+    return len(rows)
+
+
+def _publish(generation):
+    previous = _generation()
+    tmp = _path(".current.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(generation)
+    os.replace(tmp, _path("current"))
+    # Keep the previous build for readers that picked it up just before the
+    # swap; anything older (and the pre-generation flat files) goes.
+    keep = {generation, previous, "current", ".lock"}
+    for name in os.listdir(settings.REALTY_SIMILAR_ROOT):
+        if name in keep:
+            continue
+        if os.path.isdir(_path(name)):
+            shutil.rmtree(_path(name), ignore_errors=True)
+        else:
+            try:
+                os.remove(_path(name))
+            except OSError:
+                pass
+
+
+def build():
+    """Rebuild the matrix from scratch; returns the number of listings."""
+    with _locked():
+        return _build()
+
+
+def update_posts(pks):
+    """Rewrite, add or clear the rows of these listings."""
+    with _locked():
+        generation = _generation()
+        meta = _load_meta(generation) if generation else None
+        if meta is None:
+            _build()
+            return
+        ids = np.load(_path(generation, "ids.npy"), mmap_mode="r+")
+        matrix = np.load(_path(generation, "matrix.npy"), mmap_mode="r+")
+        rows = {row[0]: row for row in _rows(RealtyPost.objects.filter(pk__in=pks))}
+        slots = {int(ids[i]): i for i in np.flatnonzero(np.isin(ids, list(pks)))}
+        free = np.flatnonzero(ids == FREE)[::-1].tolist()  # pop() takes the lowest
+
+        for pk in pks:
+            row, slot = rows.get(pk), slots.get(pk)
+            if row is None:
+                if slot is not None:
+                    ids[slot] = FREE
+                    matrix[slot] = 0
+                continue
+            if slot is None:
+                if not free:
+                    _build()
+                    return
+                slot = slots[pk] = free.pop()
+            matrix[slot] = _vector(row, _numeric(row), meta)
+            ids[slot] = pk
+        matrix.flush()
+        ids.flush()
+
+
+def _index():
+    """This process's read-only maps of the published build."""
+    generation = _generation()
+    if generation is None:
+        return None
+    if generation not in _mapped:
+        try:
+            ids = np.load(_path(generation, "ids.npy"), mmap_mode="r")
+            matrix = np.load(_path(generation, "matrix.npy"), mmap_mode="r")
+        except FileNotFoundError:  # superseded and pruned while we looked
+            return None
+        if len(ids) != matrix.shape[0]:
+            return None
+        _mapped.clear()
+        _mapped[generation] = (ids, matrix)
+    return _mapped[generation]
+
+
+def similar(pk, limit):
+    """[(id, score), ...] most similar first, or None if `pk` is unknown.
+
+    Read-only: the index is written by the on_commit hooks and
+    `manage.py build_similar`, never from a request.
+    """
+    index = _index()
+    slots = np.flatnonzero(index[0] == pk) if index is not None else ()
+    if not len(slots):
+        # Not built yet, or the listing's update hook hasn't run: no matches.
+        return [] if RealtyPost.objects.filter(pk=pk).exists() else None
+    ids, matrix = index
+
+    scores = matrix @ matrix[slots[0]]
+    scores[(ids == FREE) | (ids == pk)] = -np.inf
+    limit = min(limit, int(np.isfinite(scores).sum()))
+    if limit <= 0:
+        return []
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+def _schedule(pk):
+    # robust: an index write error is logged, it never fails the save.
+    transaction.on_commit(lambda: update_posts([pk]), robust=True)
+
+
+def _on_post_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _schedule(instance.pk)
+
+
+def _on_bedroom_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _schedule(instance.post_id)
+
+
+def connect_signals():
+    post_save.connect(_on_post_change, sender=RealtyPost, dispatch_uid="similar-post")
+    post_delete.connect(_on_post_change, sender=RealtyPost, dispatch_uid="similar-post")
+    post_save.connect(_on_bedroom_change, sender=Bedroom, dispatch_uid="similar-bedroom")
+    post_delete.connect(_on_bedroom_change, sender=Bedroom, dispatch_uid="similar-bedroom")
@@ -0,0 +1,176 @@
+# realty/suggest.py
+"""Typeahead suggestions for the search box (/api/realty/suggest/?q=).
+
+Every title word, location word and whole location ("lekki phase 1") is a
+term, lowercased and stripped of accents, weighted by the number of
+listings that use it. The terms are kept in one sorted list, so the terms
+starting with a prefix are the slice between two bisects and the answer is
+the heaviest few of that slice. Answers are memoised per snapshot, so the
+same keystroke from the next visitor is a dict lookup.
+
+The snapshot is built on first use (or by the warm-up before the workers
+fork). It is rebuilt in a background thread, while the old one keeps
+answering, when a save or delete in this process marks it stale, or when
+the periodic check of the table's row count and latest updated_at shows
+that another process changed the listings. At most REALTY_SUGGEST_MAX_TERMS
+terms are kept; the rarest go first.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from .models import RealtyPost
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+STOPWORDS = frozenset("a an and at by for in of on or the to with".split())
+MEMO_SIZE = 4096
+
+
+def _words(text):
+    """[(key, as written), ...]: "Ikoyi, Lagós" -> [("ikoyi", "Ikoyi"), ("lagos", "Lagos")]."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [(word.lower(), word) for word in WORD_RE.findall(text)]
+
+
+def normalize(text):
+    return " ".join(key for key, _ in _words(text))
+
+
+def _terms(title, location):
+    """{key: (kind, display text)} of one listing, each term once."""
+    terms = {}
+    words = _words(location)
+    if len(words) > 1:
+        terms[" ".join(key for key, _ in words)] = ("location", " ".join(location.split()))
+    for kind, pairs in (("location", words), ("title", _words(title))):
+        for key, word in pairs:
+            if len(key) > 1 and key not in STOPWORDS:
+                terms.setdefault(key, (kind, word))
+    return terms
+
+
+def _fingerprint():
+    return tuple(RealtyPost.objects.aggregate(n=Count("pk"), latest=Max("updated_at")).values())
+
+
+class _Snapshot:
+    def __init__(self, keys, counts, kinds, texts, fingerprint):
+        self.keys = keys
+        self.counts = counts
+        self.kinds = kinds
+        self.texts = texts
+        self.fingerprint = fingerprint
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def lookup(self, prefix, limit):
+        with self._memo_lock:
+            result = self._memo.get((prefix, limit))
+            if result is not None:
+                self._memo.move_to_end((prefix, limit))
+                return result
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        # nlargest keeps index order on ties, i.e. alphabetical.
+        best = heapq.nlargest(limit, range(lo, hi), key=self.counts.__getitem__)
+        result = [{"text": self.texts[i], "kind": self.kinds[i], "count": self.counts[i]} for i in best]
+
+        with self._memo_lock:
+            self._memo[(prefix, limit)] = result
+            if len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return result
+
+
+def _build():
+    fingerprint = _fingerprint()  # before reading: a write during the build shows up next check
+    counts = Counter()
+    forms = {}  # key -> Counter of (kind, display text)
+    for title, location in RealtyPost.objects.values_list("title", "location").iterator(chunk_size=2000):
+        for key, form in _terms(title, location).items():
+            counts[key] += 1
+            forms.setdefault(key, Counter())[form] += 1
+
+    keys = sorted(key for key, _ in counts.most_common(settings.REALTY_SUGGEST_MAX_TERMS))
+    kinds, texts = zip(*(forms[key].most_common(1)[0][0] for key in keys)) if keys else ((), ())
+    return _Snapshot(keys, [counts[key] for key in keys], list(kinds), list(texts), fingerprint)
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._snapshot = None
+        self._stale = False
+        self._checked = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Build now, in this thread (first use and warm-up)."""
+        self._stale = False
+        self._snapshot = _build()
+        self._checked = time.monotonic()
+        return len(self._snapshot.keys)
+
+    def invalidate(self):
+        self._stale = True
+
+    def suggest(self, query, limit):
+        """[{"text", "kind", "count"}, ...] for the terms starting with `query`."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.build()
+            snapshot = self._snapshot
+        elif self._stale or time.monotonic() - self._checked > settings.REALTY_SUGGEST_CHECK_SECONDS:
+            self._refresh_in_background()
+        return snapshot.lookup(prefix, limit)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._checked = time.monotonic()
+        threading.Thread(target=self._refresh, name="realty-suggest", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            stale, self._stale = self._stale, False
+            if stale or _fingerprint() != self._snapshot.fingerprint:
+                self._snapshot = _build()
+        except Exception:
+            logger.exception("Rebuilding the suggest index failed")
+        finally:
+            self._refreshing = False
+            connections.close_all()  # this thread's connections
+
+
+index = SuggestIndex()
+
+
+def _on_post_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(index.invalidate, robust=True)
+
+
+def connect_signals():
+    post_save.connect(_on_post_change, sender=RealtyPost, dispatch_uid="suggest-post")
+    post_delete.connect(_on_post_change, sender=RealtyPost, dispatch_uid="suggest-post")
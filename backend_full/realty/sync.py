@@ -0,0 +1,5 @@
+# realty/sync.py
+from backend.sync import DeltaSync
+from .models import RealtyPost, RealtyTombstone
+
+sync = DeltaSync(RealtyPost, RealtyTombstone)
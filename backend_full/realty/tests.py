@@ -0,0 +1,236 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from adminpanel.models import Admin
+from backend.fragments import touch
+from .models import Bedroom, RealtyImage, RealtyPost
+
+
+class RealtyTestCase(TestCase):
+    """Keeps the file-backed side effects (sitemaps, similar index, admission
+    slots) in a temporary directory."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            SITEMAP_ROOT=f"{root}/sitemaps",
+            REALTY_SIMILAR_ROOT=f"{root}/similar",
+            ADMISSION_ROOT=f"{root}/admission",
+            SYNC_OVERLAP_SECONDS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.client = APIClient()
+
+    def make_post(self, **fields):
+        values = {"title": "Duplex", "type": "sale", "category": "house", "price": "60000000", "location": "Wuse, Abuja"}
+        values.update(fields)
+        return RealtyPost.objects.create(**values)
+
+    def sync(self, since=None, limit=None):
+        params = {}
+        if since:
+            params["since"] = since
+        if limit:
+            params["limit"] = limit
+        response = self.client.get("/api/realty/sync/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def sync_all(self, since=None, limit=None):
+        """Follow has_more to the end; (changed ids in order, deleted ids, cursor)."""
+        changed, deleted = [], []
+        while True:
+            page = self.sync(since, limit)
+            changed += [item["id"] for item in page["changed"]]
+            deleted += page["deleted"]
+            since = page["cursor"]
+            if not page["has_more"]:
+                return changed, deleted, since
+
+    def assertFacetsConsistent(self):
+        out = StringIO()
+        try:
+            call_command("rebuild_facets", "--check", stdout=out, stderr=StringIO())
+        except SystemExit:
+            self.fail(f"Facet counters drifted:\n{out.getvalue()}")
+
+
+class RealtyBatchTests(RealtyTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = Admin.objects.create_user("admin@example.com", "secret", role="admin")
+        self.client.force_authenticate(admin)
+        self.kept = self.make_post(title="Bungalow", type="lease", category="bungalow", price="9000000")
+        self.doomed = self.make_post(title="Terrace", price="120000000", location="Maitama")
+        Bedroom.objects.create(post=self.doomed, name="Master", sqm=20)
+        RealtyImage.objects.create(post=self.doomed, image="realty_images/terrace.jpg")
+
+    def batch(self, **payload):
+        return self.client.post("/api/realty/batch/", payload, format="json")
+
+    def test_create(self):
+        _, _, cursor = self.sync_all()
+        response = self.batch(create=[
+            {"title": "Villa", "type": "sale", "category": "villa", "price": "450000000", "location": "Asokoro",
+             "bedrooms": [{"name": "Master", "sqm": 30}, {"name": "Guest", "sqm": 18}],
+             "images": ["realty_images/villa.jpg"]},
+            {"title": "Flat", "type": "lease", "category": "flat", "price": "2500000"},
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = [item["id"] for item in response.json()["created"]]
+
+        villa = RealtyPost.objects.get(pk=ids[0])
+        self.assertEqual(villa.bedrooms.count(), 2)
+        self.assertEqual(villa.images.count(), 1)
+        self.assertFacetsConsistent()
+        changed, deleted, _ = self.sync_all(cursor)
+        self.assertEqual(changed, ids)
+        self.assertEqual(deleted, [])
+
+    def test_create_without_ids_from_bulk_insert(self):
+        # MySQL's path: one INSERT per post instead of bulk_create.
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert",
+            new_callable=mock.PropertyMock, return_value=False,
+        ):
+            response = self.batch(create=[
+                {"title": "Villa", "type": "sale", "category": "villa", "price": "450000000",
+                 "bedrooms": [{"name": "Master", "sqm": 30}]},
+                {"title": "Flat", "type": "lease", "category": "flat", "price": "2500000"},
+            ])
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = [item["id"] for item in response.json()["created"]]
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual(Bedroom.objects.filter(post_id=ids[0]).count(), 1)
+        self.assertFacetsConsistent()
+
+    def test_update(self):
+        self.client.get("/api/realty/")  # cache the fragments
+        _, _, cursor = self.sync_all()
+        response = self.batch(update=[
+            {"id": self.kept.pk, "title": "Renovated bungalow", "type": "sale", "price": "75000000",
+             "bedrooms": [{"name": "Master", "sqm": 25}]},
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertFacetsConsistent()
+        changed, _, _ = self.sync_all(cursor)
+        self.assertEqual(changed, [self.kept.pk])
+        listed = {item["id"]: item for item in self.client.get("/api/realty/").json()}
+        self.assertEqual(listed[self.kept.pk]["title"], "Renovated bungalow")
+        self.assertEqual([b["name"] for b in listed[self.kept.pk]["bedrooms"]], ["Master"])
+
+    def test_delete(self):
+        _, _, cursor = self.sync_all()
+        response = self.batch(delete=[self.doomed.pk, 999])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["deleted"], [self.doomed.pk])
+
+        self.assertFalse(RealtyPost.objects.filter(pk=self.doomed.pk).exists())
+        self.assertFalse(Bedroom.objects.filter(post_id=self.doomed.pk).exists())
+        self.assertFalse(RealtyImage.objects.filter(post_id=self.doomed.pk).exists())
+        self.assertFacetsConsistent()
+        changed, deleted, _ = self.sync_all(cursor)
+        self.assertEqual(changed, [])
+        self.assertEqual(deleted, [self.doomed.pk])
+
+    def test_invalid_item_saves_nothing(self):
+        response = self.batch(
+            create=[{"title": "No type"}],
+            delete=[self.doomed.pk],
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(RealtyPost.objects.filter(pk=self.doomed.pk).exists())
+        self.assertFacetsConsistent()
+
+    def test_requires_admin_role(self):
+        staff = Admin.objects.create_user("staff@example.com", "secret", role="moderator", is_staff=True)
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.batch(delete=[self.doomed.pk]).status_code, 403)
+
+
+class RealtySyncTests(RealtyTestCase):
+    def test_pages_through_every_post_once(self):
+        posts = [self.make_post(title=f"Post {n}") for n in range(5)]
+        # A batch stamps many posts with one time; paging must still be exact.
+        RealtyPost.objects.update(updated_at=posts[0].updated_at)
+
+        first = self.sync(limit=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["changed"]), 2)
+        changed, deleted, _ = self.sync_all(first["cursor"], limit=2)
+        self.assertEqual(
+            [item["id"] for item in first["changed"]] + changed,
+            [post.pk for post in posts],
+        )
+        self.assertEqual(deleted, [])
+
+    def test_changes_and_deletes_since_cursor(self):
+        edited, removed, _ = [self.make_post(title=f"Post {n}") for n in range(3)]
+        _, _, cursor = self.sync_all()
+
+        edited.title = "Edited"
+        edited.save()
+        removed_pk = removed.pk
+        removed.delete()
+        changed, deleted, cursor = self.sync_all(cursor)
+        self.assertEqual(changed, [edited.pk])
+        self.assertEqual(deleted, [removed_pk])
+
+        changed, deleted, _ = self.sync_all(cursor)
+        self.assertEqual((changed, deleted), ([], []))
+
+    def test_rejects_tampered_cursor(self):
+        self.make_post()
+        cursor = self.sync()["cursor"]
+        response = self.client.get("/api/realty/sync/", {"since": cursor[:-2] + "xx"})
+        self.assertEqual(response.status_code, 400)
+
+
+class RealtyFragmentTests(RealtyTestCase):
+    def titles(self):
+        return [item["title"] for item in self.client.get("/api/realty/").json()]
+
+    def test_list_is_ordered_by_id(self):
+        posts = [self.make_post(title=f"Post {n}") for n in range(3)]
+        posts[0].title = "Post 0 edited"
+        posts[0].save()
+        self.assertEqual(
+            [item["id"] for item in self.client.get("/api/realty/").json()],
+            [post.pk for post in posts],
+        )
+
+    def test_edit_replaces_cached_fragment(self):
+        post = self.make_post(title="Before")
+        self.assertEqual(self.titles(), ["Before"])
+        RealtyPost.objects.filter(pk=post.pk).update(title="Unseen")
+        self.assertEqual(self.titles(), ["Before"])  # served from the cache
+
+        post.title = "After"
+        post.save()
+        self.assertEqual(self.titles(), ["After"])
+
+    def test_child_write_replaces_parent_fragment(self):
+        post = self.make_post()
+        self.client.get("/api/realty/")
+        Bedroom.objects.create(post=post, name="Master", sqm=20)
+        item = self.client.get("/api/realty/").json()[0]
+        self.assertEqual([b["name"] for b in item["bedrooms"]], ["Master"])
+
+    def test_touch_replaces_fragment(self):
+        post = self.make_post(title="Before")
+        self.client.get("/api/realty/")
+        RealtyPost.objects.filter(pk=post.pk).update(title="After")
+        touch(RealtyPost, [post.pk])
+        self.assertEqual(self.titles(), ["After"])
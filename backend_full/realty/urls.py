@@ -1,7 +1,16 @@
 from django.urls import path
-from .views import RealtyPostListView, RealtyPostDetailView
+from .views import (
+    RealtyPostListView, RealtyPostDetailView, RealtyNearbyView, RealtyFacetsView, RealtySimilarView,
+    RealtySuggestView, RealtySyncView, RealtyBatchView,
+)
 
 urlpatterns = [
     path('', RealtyPostListView.as_view(), name='realty-list'),
+    path('nearby/', RealtyNearbyView.as_view(), name='realty-nearby'),
+    path('facets/', RealtyFacetsView.as_view(), name='realty-facets'),
+    path('sync/', RealtySyncView.as_view(), name='realty-sync'),
+    path('suggest/', RealtySuggestView.as_view(), name='realty-suggest'),
+    path('batch/', RealtyBatchView.as_view(), name='realty-batch'),
     path('<int:pk>/', RealtyPostDetailView.as_view(), name='realty-detail'),
+    path('<int:pk>/similar/', RealtySimilarView.as_view(), name='realty-similar'),
 ]
@@ -1,13 +1,36 @@
 # realty/views.py
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
 from rest_framework import generics, status
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from . import batch
+from .facets import counter as facet_counter
+from .geo import covering_prefixes, haversine_km
 from .models import RealtyPost
-from .serializers import RealtyPostSerializer
+from .similar import similar
+from .suggest import index as suggest_index
+from .sync import sync as post_sync
+from .serializers import RealtyBatchItemSerializer, RealtyBatchSerializer, RealtyPostSerializer
+from adminpanel.views import IsAdminUserRole
+from backend.fragments import FragmentCache
+from backend.sync import ExpiredCursor, InvalidCursor
+
+post_fragments = FragmentCache(
+    "realty-post",
+    RealtyPost.objects.prefetch_related('images', 'bedrooms'),
+    RealtyPostSerializer,
+)
+
 
 class RealtyPostListView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
-    queryset = RealtyPost.objects.prefetch_related('images', 'bedrooms').all()
+    # Explicit order: the (id, updated_at) query would otherwise follow
+    # whichever index the database reads it from.
+    queryset = RealtyPost.objects.prefetch_related('images', 'bedrooms').order_by('pk')
     serializer_class = RealtyPostSerializer
 
     def get_serializer_context(self):
@@ -15,6 +38,11 @@ class RealtyPostListView(generics.ListCreateAPIView):
         context.update({"request": self.request})
         return context
 
+    def list(self, request, *args, **kwargs):
+        # ✅ Serialize only the posts whose cached fragment is missing or stale
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(post_fragments.render_queryset(queryset, request))
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data,
@@ -35,6 +63,12 @@ class RealtyPostDetailView(generics.RetrieveUpdateDestroyAPIView):
         context.update({"request": self.request})
         return context
 
+    def retrieve(self, request, *args, **kwargs):
+        data = post_fragments.render_queryset(self.get_queryset().filter(pk=kwargs['pk']), request)
+        if not data:
+            raise Http404
+        return Response(data[0])
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
@@ -55,3 +89,186 @@ class RealtyPostDetailView(generics.RetrieveUpdateDestroyAPIView):
             {"detail": "Post updated successfully!", "data": serializer.data},
             status=status.HTTP_200_OK
         )
+
+
+class RealtyNearbyView(APIView):
+    """GET /api/realty/nearby/?lat=&lng=&radius= — Listings within `radius` km, nearest first"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params["lat"])
+            lng = float(request.query_params["lng"])
+            radius = float(request.query_params.get("radius", 10))
+            limit = int(request.query_params.get("limit", 20))
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "lat and lng are required; lat, lng, radius and limit must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or radius <= 0 or limit <= 0:
+            return Response(
+                {"error": "lat/lng out of range, or radius/limit not positive."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        radius = min(radius, settings.REALTY_NEARBY_MAX_RADIUS_KM)
+        limit = min(limit, settings.REALTY_NEARBY_MAX_RESULTS)
+
+        # 1. Prune with indexed geohash prefix scans (LIKE 'prefix%').
+        candidates = RealtyPost.objects.exclude(geohash='')
+        prefixes = covering_prefixes(lat, lng, radius)
+        if prefixes:
+            cells = Q()
+            for prefix in prefixes:
+                cells |= Q(geohash__startswith=prefix)
+            candidates = candidates.filter(cells)
+        rows = list(candidates.values_list('id', 'latitude', 'longitude', 'updated_at'))
+        if not rows:
+            return Response([], status=status.HTTP_200_OK)
+
+        # 2. Exact distances for the survivors in one vectorised pass.
+        _, lats, lngs, _ = zip(*rows)
+        distances = haversine_km(lat, lng, np.array(lats, dtype=float), np.array(lngs, dtype=float))
+        inside = np.flatnonzero(distances <= radius)
+        nearest = inside[np.argsort(distances[inside], kind='stable')[:limit]]
+
+        distance_by_id = {rows[i][0]: round(float(distances[i]), 3) for i in nearest}
+        fragments = post_fragments.render([(rows[i][0], rows[i][3]) for i in nearest], request)
+        data = [dict(item, distance_km=distance_by_id[item['id']]) for item in fragments]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class RealtyFacetsView(APIView):
+    """GET /api/realty/facets/ — Listing counts per type, category, location and price band"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(facet_counter.counts(), status=status.HTTP_200_OK)
+
+
+class RealtySyncView(APIView):
+    """GET /api/realty/sync/?since=<cursor>&limit= — Listings changed or deleted since the cursor"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", settings.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.SYNC_PAGE_SIZE))
+
+        try:
+            rows, deleted, cursor, has_more = post_sync.changes(request.query_params.get("since"), limit)
+        except ExpiredCursor as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_410_GONE)
+        except InvalidCursor as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ✅ Same cached fragments as the list; keep requesting while has_more
+        return Response({
+            "changed": post_fragments.render(rows, request),
+            "deleted": deleted,
+            "cursor": cursor,
+            "has_more": has_more,
+        }, status=status.HTTP_200_OK)
+
+
+class RealtySuggestView(APIView):
+    """GET /api/realty/suggest/?q=&limit= — Location and title completions for the search box"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 8))
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.REALTY_SUGGEST_MAX_RESULTS))
+        query = request.query_params.get("q", "")[:100]
+        # ✅ Answered from the in-process prefix index, never a LIKE query
+        return Response(suggest_index.suggest(query, limit), status=status.HTTP_200_OK)
+
+
+class RealtySimilarView(APIView):
+    """GET /api/realty/<pk>/similar/?limit= — Listings most like this one, best match first"""
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        try:
+            limit = int(request.query_params.get("limit", 6))
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.REALTY_SIMILAR_MAX_RESULTS))
+
+        matches = similar(pk, limit)
+        if matches is None:
+            raise Http404
+        if not matches:
+            return Response([], status=status.HTTP_200_OK)
+
+        # ✅ Same cached fragments as the list, plus the similarity score
+        score_by_id = {post_id: round(score, 4) for post_id, score in matches}
+        updated = dict(RealtyPost.objects.filter(pk__in=score_by_id).values_list('pk', 'updated_at'))
+        fragments = post_fragments.render(
+            [(post_id, updated[post_id]) for post_id, _ in matches if post_id in updated], request
+        )
+        data = [dict(item, similarity=score_by_id[item['id']]) for item in fragments]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def _item_id(item):
+    try:
+        return int(item.get('id'))
+    except (TypeError, ValueError):
+        return None
+
+
+class RealtyBatchView(APIView):
+    """POST /api/realty/batch/ — Create, update and delete many listings in one transaction"""
+    permission_classes = [IsAdminUserRole]
+
+    def post(self, request):
+        envelope = RealtyBatchSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        create = envelope.validated_data.get('create', [])
+        update = envelope.validated_data.get('update', [])
+        delete = envelope.validated_data.get('delete', [])
+
+        # ✅ Validate every item first; nothing is written unless all pass
+        errors = {"create": [], "update": []}
+        creates = []
+        for index, item in enumerate(create):
+            serializer = RealtyBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                creates.append(serializer.validated_data)
+            else:
+                errors["create"].append({"index": index, "errors": serializer.errors})
+
+        posts = RealtyPost.objects.in_bulk([pk for pk in map(_item_id, update) if pk])
+        updates, seen = [], set(delete)
+        for index, item in enumerate(update):
+            post = posts.get(_item_id(item))
+            if post is None:
+                errors["update"].append({"index": index, "errors": {"id": ["No listing with this id."]}})
+                continue
+            if post.pk in seen:
+                errors["update"].append({"index": index, "errors": {"id": ["Listed twice in this batch."]}})
+                continue
+            seen.add(post.pk)
+            serializer = RealtyBatchItemSerializer(post, data=item, partial=True)
+            if serializer.is_valid():
+                updates.append((post, serializer.validated_data))
+            else:
+                errors["update"].append({"index": index, "errors": serializer.errors})
+
+        if errors["create"] or errors["update"]:
+            return Response(
+                {"error": "Nothing was saved; fix the items below.", **errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created, updated, deleted = batch.apply(creates, updates, delete)
+        return Response({
+            "created": [{"index": index, "id": post.pk} for index, post in enumerate(created)],
+            "updated": [{"index": index, "id": post.pk} for index, post in enumerate(updated)],
+            "deleted": deleted,
+        }, status=status.HTTP_200_OK)